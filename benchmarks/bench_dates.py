@@ -0,0 +1,110 @@
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import biletinial_dates
+
+# python benchmarks/bench_dates.py --showings 100000
+#
+# Date handling of fetch_and_group_events / the output sort on synthetic listings:
+# the previous per-event string -> datetime parsing (kept below for comparison) against
+# memoized biletinial_dates ordinals. Exits with 1 if both produce different groupings.
+
+TURKISH_MONTHS = biletinial_dates.TURKISH_MONTHS
+WEEKDAYS = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
+
+
+def synthetic_raw_dates(showings, days, seed):
+    """Listing date strings like 'Nisan - 18 Cuma', a few of them spanning two days."""
+    rng = random.Random(seed)
+    start = datetime(2000, 1, 1)
+    raws = []
+    for _ in range(showings):
+        day = start + timedelta(days=rng.randrange(days))
+        month = biletinial_dates.MONTH_NAMES[day.month]
+        raw = f"{month} - {day.day:02d} {WEEKDAYS[day.weekday()]}"
+        if rng.random() < 0.1 and (day + timedelta(days=1)).month == day.month:
+            raw += f" - {day.day + 1:02d} {WEEKDAYS[(day.weekday() + 1) % 7]}"
+        raws.append(raw)
+    return raws
+
+
+def legacy_extract_dates(date_string):
+    parts = date_string.split(" - ")
+    month = parts[0]
+    if month not in TURKISH_MONTHS:
+        return []
+    return [f"{month} - {part.split(' ')[0].zfill(2)}" for part in parts[1:] if part.split(" ")[0].isdigit()]
+
+
+def legacy_parse(date_str):
+    try:
+        month_name, day = date_str.split(" - ")
+        return datetime(datetime.now().year, int(TURKISH_MONTHS[month_name]), int(day))
+    except (ValueError, KeyError):
+        return None
+
+
+def legacy_group(raws):
+    events_by_date = {}
+    parsed = set()
+    for raw in raws:
+        for date_str in legacy_extract_dates(raw):
+            parsed_date = legacy_parse(date_str)
+            if parsed_date:
+                parsed.add(parsed_date)
+                events_by_date.setdefault(date_str, []).append(raw)
+    current = min(parsed)
+    while current <= max(parsed):
+        month_name = [name for name, num in TURKISH_MONTHS.items() if num == current.strftime("%m")][0]
+        events_by_date.setdefault(f"{month_name} - {current.strftime('%d')}", [])
+        current += timedelta(days=1)
+    return sorted(events_by_date, key=lambda key: legacy_parse(key) or datetime.min), events_by_date
+
+
+def ordinal_group(raws):
+    events_by_date = {}
+    parsed = set()
+    # Start of the year as reference keeps every synthetic date in one year, like the legacy path
+    reference = datetime(datetime.now().year, 1, 1).toordinal()
+    for raw in raws:
+        for date_str, ordinal in biletinial_dates.parse_raw_dates(raw, reference):
+            parsed.add(ordinal)
+            events_by_date.setdefault(date_str, []).append(raw)
+    for ordinal in range(min(parsed), max(parsed) + 1):
+        events_by_date.setdefault(biletinial_dates.date_key(ordinal), [])
+    return sorted(events_by_date, key=lambda key: biletinial_dates.parse_date_key(key, reference) or 0), events_by_date
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-event datetime parsing vs. memoized day ordinals.")
+    parser.add_argument("--showings", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=120, help="Days covered by the listings (kept inside one year)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    raws = synthetic_raw_dates(args.showings, args.days, args.seed)
+    (legacy_order, legacy_groups), legacy_ms = timed(legacy_group, raws)
+    (ordinal_order, ordinal_groups), cold_ms = timed(ordinal_group, raws)
+    _, warm_ms = timed(ordinal_group, raws)
+
+    print(f"{args.showings} showings, {len(set(raws))} distinct date strings, {len(ordinal_order)} days")
+    print(f"  {'datetime per event':<22} {legacy_ms:9.1f} ms")
+    print(f"  {'ordinals (cold memo)':<22} {cold_ms:9.1f} ms  x{legacy_ms / cold_ms:5.1f}")
+    print(f"  {'ordinals (warm memo)':<22} {warm_ms:9.1f} ms  x{legacy_ms / warm_ms:5.1f}")
+
+    if legacy_order != ordinal_order or legacy_groups != ordinal_groups:
+        print("Groupings differ.")
+        sys.exit(1)
+    print("Groupings identical.")
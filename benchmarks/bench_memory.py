@@ -0,0 +1,118 @@
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import biletinial_dates
+import biletinial_scraper as scraper
+import etkinlik_planlayici as planlayici
+
+# python benchmarks/bench_memory.py --events 50000 100000
+#
+# Memory retained by the grouped events of a nationwide sweep: per-event dicts (as parsed,
+# every string a separate object) against the interned EventTable used by
+# fetch_and_group_events (group_events), and the same for the planner's parse_events output.
+
+CITIES = 81
+WEEKDAYS = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
+
+
+def synthetic_parsed_events(count, plays, seed):
+    """extract_events-style dicts; strings are built per event like a parser does."""
+    rng = random.Random(seed)
+    events = []
+    for _ in range(count):
+        play = rng.randrange(plays)
+        city = rng.randrange(CITIES)
+        month = biletinial_dates.MONTH_NAMES[rng.choice((4, 5, 6))]
+        day = rng.randrange(1, 29)
+        date = f"{month} - {day:02d} {WEEKDAYS[day % 7]}"
+        if rng.random() < 0.3:
+            date += f" - {day + 1:02d} {WEEKDAYS[(day + 1) % 7]}"
+        events.append({
+            'date': date,
+            'play': f"Oyun {play}",
+            'venue': f"Şehir {city} Kültür Merkezi - Sahne {play % 3}",
+            'category': ''.join(['tiya', 'tro']) if play % 4 else ''.join(['opera', '-bale']),
+            'link_relative': f"/tr-tr/tiyatro/oyun-{play}"
+        })
+    return events
+
+
+def group_dicts(events):
+    """Previous fetch_and_group_events grouping: the parsed dicts themselves, per date."""
+    unique_events = {}
+    for event in events:
+        unique_events.setdefault((event['link_relative'], event['date'], event['venue'], event['category']), event)
+    events_by_date = defaultdict(list)
+    for event in unique_events.values():
+        for date_str, _ in biletinial_dates.parse_raw_dates(event['date']):
+            events_by_date[date_str].append(event)
+    return dict(events_by_date)
+
+
+def fresh(value):
+    """A new object equal to value, like the previous per-line string splitting / strptime produced."""
+    if isinstance(value, str):
+        return value.encode('utf-8').decode('utf-8')
+    if isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+def planner_dicts(text):
+    return [{field: fresh(value) for field, value in event.items()} for event in planlayici.parse_events(text)]
+
+
+def planner_text(grouped):
+    lines = []
+    for date_str in sorted(grouped, key=biletinial_dates.parse_date_key):
+        lines.append(f"\n{date_str}:")
+        for event in grouped[date_str]:
+            lines.append(f"  - [{event['category'].upper()}] {event['play']} – {event['venue']} -> "
+                         f"https://biletinial.com{event['link_relative']}")
+    return "\n".join(lines)
+
+
+def retained(build, *args):
+    """(result, bytes still allocated by build once it returns, seconds)."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build(*args)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark memory of dict event lists vs. the interned event table.")
+    parser.add_argument("--events", type=int, nargs='+', default=[20000, 100000], help="Parsed events per run")
+    parser.add_argument("--plays", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'events':>8} {'stage':<22} {'dicts MB':>9} {'table MB':>9} {'ratio':>6} {'dicts s':>8} {'table s':>8}")
+    for count in args.events:
+        # Each run builds its own copy so dict and table start from equally fresh strings
+        (dict_grouped, dict_size, dict_time) = retained(lambda: group_dicts(synthetic_parsed_events(count, args.plays, args.seed)))
+        (table_grouped, table_size, table_time) = retained(lambda: scraper.group_events(synthetic_parsed_events(count, args.plays, args.seed)))
+        print(f"{count:>8} {'scraper grouping':<22} {dict_size / 2**20:9.1f} {table_size / 2**20:9.1f} "
+              f"{dict_size / table_size:6.1f} {dict_time:8.2f} {table_time:8.2f}")
+
+        text = planner_text(table_grouped)
+        del dict_grouped, table_grouped
+        (dict_events, dict_size, dict_time) = retained(planner_dicts, text)
+        (table_events, table_size, table_time) = retained(planlayici.parse_events, text)
+        print(f"{count:>8} {'planner parse_events':<22} {dict_size / 2**20:9.1f} {table_size / 2**20:9.1f} "
+              f"{dict_size / table_size:6.1f} {dict_time:8.2f} {table_time:8.2f}")
+        del dict_events, table_events
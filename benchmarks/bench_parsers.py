@@ -0,0 +1,74 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import biletinial_scraper as scraper
+
+# python benchmarks/bench_parsers.py --repeat 20
+#
+# Compares every installed parser backend (full page and listing-subtree only) against
+# the reference html.parser full-page parse on the fixture pages. Exits with 1 if any
+# backend produces different events. The default fixtures are synthetic (hand-written to
+# imitate the site), so agreement there only covers that markup; run with --fixture-dir on
+# saved real pages to check the backends against the live site.
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'synthetic')
+
+
+def load_fixtures(pattern, fixture_dir=FIXTURE_DIR):
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(fixture_dir, pattern))):
+        # File names look like '<category>_<city>.html'
+        category = os.path.basename(path).split('_')[0]
+        with open(path, 'r', encoding='utf-8') as f:
+            fixtures.append((os.path.basename(path), category, f.read()))
+    return fixtures
+
+
+def time_parse(html, category, backend, listing_only, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        events = scraper.extract_events(html, category, backend=backend, listing_only=listing_only)
+    return events, (time.perf_counter() - start) * 1000 / repeat
+
+
+def available_backends():
+    backends = ['html.parser']
+    if scraper.LXML_AVAILABLE:
+        backends.append('lxml')
+    if scraper.SelectolaxParser is not None:
+        backends.append('selectolax')
+    return backends
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark extract_events parser backends on fixture pages.")
+    parser.add_argument("--repeat", type=int, default=10, help="Parses per fixture and mode")
+    parser.add_argument("--fixtures", default="*_*.html", help="Glob of fixture files inside --fixture-dir")
+    parser.add_argument("--fixture-dir", default=FIXTURE_DIR, help="Directory of <category>_<city>.html pages (default: the synthetic pages)")
+    args = parser.parse_args()
+
+    mismatches = 0
+    for name, category, html in load_fixtures(args.fixtures, args.fixture_dir):
+        reference, reference_ms = time_parse(html, category, 'html.parser', False, args.repeat)
+        print(f"\n{name} ({len(html) // 1024} KB, {len(reference)} events)")
+        print(f"  {'html.parser / full page':<28} {reference_ms:8.2f} ms/page  (reference)")
+        for backend in available_backends():
+            for listing_only in (False, True):
+                if backend == 'html.parser' and not listing_only:
+                    continue
+                events, ms = time_parse(html, category, backend, listing_only, args.repeat)
+                identical = events == reference
+                mismatches += not identical
+                mode = 'listing only' if listing_only else 'full page'
+                print(f"  {backend + ' / ' + mode:<28} {ms:8.2f} ms/page  x{reference_ms / ms:5.1f}  "
+                      f"{'identical' if identical else 'MISMATCH'}")
+
+    if mismatches:
+        print(f"\n{mismatches} backend/mode combinations produced different events.")
+        sys.exit(1)
+    print("\nAll backends produced identical events.")
@@ -0,0 +1,59 @@
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import etkinlik_planlayici as planlayici
+
+# python benchmarks/bench_planner.py --sizes 1000 5000 10000
+#
+# Compares the greedy create_plan with create_optimal_plan on synthetic schedules:
+# a few long-running plays shown almost every day plus many plays with only a handful of dates.
+# Thousands of showings over 40 plays are the easy case: every play fits, the bound closes at once.
+# A few hundred showings are the hard case: more plays than the schedule has room for, so the
+# solver has to prove which ones cannot fit and may run out of --time-budget (one city's listings
+# look like this).
+
+
+def synthetic_events(showings, plays, days, seed):
+    rng = random.Random(seed)
+    start = datetime(2000, 1, 1)
+    # Play popularity is skewed: low play numbers run for weeks, high ones only a few nights
+    popularity = [1.0 / (rank + 1) for rank in range(plays)]
+    names = rng.choices([f"Oyun {rank}" for rank in range(plays)], weights=popularity, k=showings)
+    events = []
+    for name in names:
+        day = start + timedelta(days=rng.randrange(days))
+        events.append({'date': day, 'day': day.toordinal(), 'name': name,
+                       'full_detail': f"[TIYATRO] {name} – Sahne -> https://example.com/{name}"})
+    events.sort(key=lambda x: x['day'])
+    return events
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark greedy vs. optimal plan solver.")
+    parser.add_argument("--sizes", type=int, nargs='+', default=[100, 200, 1000, 2000, 5000, 10000], help="Number of showings per run")
+    parser.add_argument("--plays", type=int, default=40, help="Distinct plays")
+    parser.add_argument("--days", type=int, default=200, help="Days covered by the schedule")
+    parser.add_argument("--min-days", type=int, default=4)
+    parser.add_argument("--time-budget", type=float, default=planlayici.DEFAULT_TIME_BUDGET)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'showings':>9} {'greedy':>7} {'ms':>9} {'optimal':>8} {'ms':>9}  proven")
+    for size in args.sizes:
+        events = synthetic_events(size, args.plays, args.days, args.seed)
+
+        start = time.perf_counter()
+        greedy = planlayici.create_plan(events, args.min_days)
+        greedy_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        optimal, proven = planlayici.create_optimal_plan(events, args.min_days, time_budget=args.time_budget)
+        optimal_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{size:>9} {len(greedy):>7} {greedy_ms:>9.1f} {len(optimal):>8} {optimal_ms:>9.1f}  {'yes' if proven else 'no (time budget)'}")
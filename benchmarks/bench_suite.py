@@ -0,0 +1,174 @@
+import argparse
+import gc
+import glob
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import biletinial_scraper as scraper
+import etkinlik_planlayici as planlayici
+from bench_memory import synthetic_parsed_events
+from bench_planner import synthetic_events
+from standin_server import FIXTURE_DIR, start_server
+
+# python benchmarks/bench_suite.py                      compare with benchmarks/baseline.json
+# python benchmarks/bench_suite.py --save-baseline      record the current numbers as the baseline
+#
+# Offline end-to-end benchmark. The fetch stages run the real client against the local
+# stand-in server (synthetic fixture pages, injected latency and 503s); the other stages time
+# extract_events on the fixtures and group_events / create_plan on synthetic data.
+# Metrics ending in _per_sec are better when higher, all others (ms) when lower.
+# Exits with 1 if any metric is worse than the baseline by more than --tolerance.
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+SWEEP_CITIES = ['antalya', 'ankara', 'izmir', 'bursa', 'eskisehir', 'adana', 'mersin', 'konya', 'kayseri', 'samsun']
+SWEEP_CATEGORIES = ['tiyatro', 'opera-bale']
+
+
+def best_ms(rounds, function, *function_args):
+    """
+    Fastest of `rounds` runs in ms; the minimum is the least noisy estimate for CPU-bound code.
+    The garbage collector is paused while timing, as timeit does.
+    """
+    best = None
+    for _ in range(rounds):
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            function(*function_args)
+            elapsed = (time.perf_counter() - started) * 1000
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_fetch(args, metrics):
+    server = start_server(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                          cities=SWEEP_CITIES)
+    port = server.server_address[1]
+    scraper.BASE_URL_FORMAT = f'http://127.0.0.1:{port}/tr-tr/{{category}}/'
+    scraper.BASE_DOMAIN = f'http://127.0.0.1:{port}'
+    client = scraper.HttpClient(concurrency=args.concurrency, rate=args.rate)
+    try:
+        started = time.perf_counter()
+        grouped = scraper.fetch_and_group_events(SWEEP_CATEGORIES, SWEEP_CITIES[:args.cities], [], [], [], client=client,
+                                                 parse_workers=args.parse_workers)
+        elapsed = time.perf_counter() - started
+        pages = args.cities * len(SWEEP_CATEGORIES)
+        metrics['fetch_pages_per_sec'] = pages / elapsed
+
+        started = time.perf_counter()
+        scraper.enrich_events(grouped, client)
+        elapsed = time.perf_counter() - started
+        metrics['detail_pages_per_sec'] = client.stats['detail_pages'] / elapsed
+        print(f"  fetch: {pages} listing + {client.stats['detail_pages']} detail pages, {client.summary()}")
+        print(f"  stand-in: {server.stats}")
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+
+def bench_parse(args, metrics):
+    total_ms = 0
+    paths = sorted(glob.glob(os.path.join(FIXTURE_DIR, '*_*.html')))
+    for path in paths:
+        category = os.path.basename(path).split('_')[0]
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        total_ms += best_ms(args.rounds, scraper.extract_events, html, category, args.parser)
+    metrics['parse_ms_per_page'] = total_ms / len(paths)
+
+
+def bench_group(args, metrics):
+    for scale in args.scales:
+        events = synthetic_parsed_events(scale, args.plays, args.seed)
+        metrics[f'group_ms_{scale}'] = best_ms(args.rounds, scraper.group_events, events)
+
+
+def bench_plan(args, metrics):
+    for scale in args.scales:
+        events = synthetic_events(scale, args.plays, args.days, args.seed)
+        metrics[f'plan_ms_{scale}'] = best_ms(args.rounds, planlayici.create_plan, events, args.min_days)
+
+
+STAGES = {'fetch': bench_fetch, 'parse': bench_parse, 'group': bench_group, 'plan': bench_plan}
+
+
+def higher_is_better(metric):
+    return metric.endswith('_per_sec')
+
+
+def compare(metrics, baseline, tolerance):
+    """Prints current vs. baseline per metric; returns the names of regressed metrics."""
+    regressions = []
+    print(f"\n{'metric':<24} {'baseline':>12} {'current':>12} {'change':>8}")
+    for metric, value in metrics.items():
+        reference = baseline.get(metric)
+        if reference is None:
+            print(f"{metric:<24} {'-':>12} {value:12.2f} {'new':>8}")
+            continue
+        change = (value - reference) / reference if reference else 0.0
+        worse = -change if higher_is_better(metric) else change
+        regressed = worse > tolerance
+        if regressed:
+            regressions.append(metric)
+        print(f"{metric:<24} {reference:12.2f} {value:12.2f} {change:+7.0%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmark suite with a local stand-in server and a stored baseline.")
+    parser.add_argument("--stages", nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--scales", type=int, nargs='+', default=[1000, 10000, 100000], help="Synthetic showings for the group/plan stages (up to 1000000)")
+    parser.add_argument("--cities", type=int, default=len(SWEEP_CITIES), help=f"Cities swept in the fetch stage (max {len(SWEEP_CITIES)})")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Fraction of stand-in responses answered with 503")
+    parser.add_argument("--concurrency", type=int, default=scraper.DEFAULT_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=0, help="Requests/sec per host (default 0: no politeness limit against the stand-in)")
+    parser.add_argument("--parse-workers", type=int, default=scraper.DEFAULT_PARSE_WORKERS)
+    parser.add_argument("--parser", choices=scraper.PARSER_BACKENDS, default='auto')
+    parser.add_argument("--rounds", type=int, default=5, help="Runs per parse/group/plan measurement, the fastest counts")
+    parser.add_argument("--plays", type=int, default=400)
+    parser.add_argument("--days", type=int, default=200)
+    parser.add_argument("--min-days", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed relative slowdown before a metric counts as a regression")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    metrics = {}
+    for stage in args.stages:
+        print(f"[{stage}]")
+        STAGES[stage](args, metrics)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'machine': f"{platform.python_implementation()} {platform.python_version()}, "
+                                  f"{os.cpu_count()} CPU, {platform.machine()}",
+                       'metrics': {metric: round(value, 3) for metric, value in metrics.items()}}, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        for metric, value in metrics.items():
+            print(f"  {metric:<24} {value:12.2f}")
+        sys.exit(0)
+
+    try:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline first.")
+        sys.exit(0)
+    print(f"(baseline recorded on {baseline.get('machine', 'unknown machine')})")
+    regressions = compare(metrics, baseline['metrics'], args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nNo regressions.")
@@ -0,0 +1,144 @@
+import argparse
+import glob
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+# python benchmarks/standin_server.py --port 8000 --latency-ms 80 --error-rate 0.05
+#
+# Local stand-in for biletinial.com that replays the pages in a fixture directory:
+#   /tr-tr/<category>/<city>  -> <category>_<city>.html, or any <category>_*.html for the
+#                                extra --cities that have no page of their own
+#   /tr-tr/<category>/<city>?loc=5&page=2
+#                             -> <category>_<city>.loc-5.page-2.html (query parameters sorted)
+#                                if that page exists, else the page without a query
+#   any other path            -> event-detail.html
+# The default directory, benchmarks/fixtures/synthetic, holds hand-written pages that imitate
+# the site's markup; they are not recordings. Save real pages under the same names (e.g.
+# curl https://biletinial.com/tr-tr/tiyatro/antalya > recorded/tiyatro_antalya.html) and pass
+# --fixture-dir to replay those instead.
+# Every response is delayed by --latency-ms (+- --jitter-ms) and --error-rate of them fail
+# with 503, so retries and the politeness budget show up in the numbers. Point the scraper
+# at it by setting BASE_URL_FORMAT / BASE_DOMAIN (see bench_suite.py).
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'synthetic')
+DETAIL_FIXTURE = 'event-detail.html'
+
+
+def query_variant(query):
+    """'page=2&loc=5' -> 'loc-5.page-2', the fixture file suffix of a listing query."""
+    return '.'.join(f"{name}-{value}" for name, value in sorted(parse_qsl(query, keep_blank_values=True)))
+
+
+def load_fixtures(fixture_dir=FIXTURE_DIR):
+    """Returns ({(category, city): page}, {(category, city, query variant): page}, detail page)."""
+    listings = {}
+    variants = {}
+    for path in sorted(glob.glob(os.path.join(fixture_dir, '*_*.html'))):
+        name, _, variant = os.path.basename(path)[:-len('.html')].partition('.')
+        category, city = name.split('_', 1)
+        with open(path, 'rb') as f:
+            if variant:
+                variants[(category, city, variant)] = f.read()
+            else:
+                listings[(category, city)] = f.read()
+    with open(os.path.join(fixture_dir, DETAIL_FIXTURE), 'rb') as f:
+        detail = f.read()
+    return listings, variants, detail
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=1, cities=(), fixture_dir=FIXTURE_DIR):
+        super().__init__(address, StandInHandler)
+        self.listings, self.variants, self.detail = load_fixtures(fixture_dir)
+        self.categories = {category: body for (category, _), body in self.listings.items()}
+        self.cities = {city for _, city in self.listings} | set(cities)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'listing': 0, 'detail': 0}
+
+    def count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def draw(self):
+        """(delay in seconds, inject an error?) for the next response."""
+        with self.lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+            fail = self.random.random() < self.error_rate
+        return max(0.0, self.latency_ms + jitter) / 1000, fail
+
+    def page(self, path):
+        url = urlsplit(path)
+        parts = [part for part in url.path.split('/') if part]
+        # Listing URLs are /tr-tr/<category>/<city>, event pages /tr-tr/<category>/<slug>
+        if len(parts) == 3 and parts[1] in self.categories and parts[2] in self.cities:
+            self.count('listing')
+            variant = self.variants.get((parts[1], parts[2], query_variant(url.query)))
+            if variant is not None:
+                return variant
+            return self.listings.get((parts[1], parts[2]), self.categories[parts[1]])
+        self.count('detail')
+        return self.detail
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        server.count('requests')
+        delay, fail = server.draw()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            server.count('errors')
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.send_header('Retry-After', '0')
+            self.end_headers()
+            return
+        body = server.page(self.path)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=1, cities=(), fixture_dir=FIXTURE_DIR):
+    """Starts the stand-in on 127.0.0.1 in a background thread; returns the server (port in server_address[1])."""
+    server = StandInServer(('127.0.0.1', port), latency_ms, jitter_ms, error_rate, seed, cities, fixture_dir)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve biletinial fixture pages locally.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of responses answered with 503")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--cities", nargs='*', default=[], help="Extra city slugs served with the fixture listings")
+    parser.add_argument("--fixture-dir", default=FIXTURE_DIR, help="Directory of <category>_<city>.html and event-detail.html (default: the synthetic pages)")
+    args = parser.parse_args()
+
+    server = StandInServer(('127.0.0.1', args.port), args.latency_ms, args.jitter_ms, args.error_rate, args.seed, args.cities,
+                           args.fixture_dir)
+    print(f"Serving {len(server.listings)} listing fixtures on http://127.0.0.1:{args.port}/tr-tr/<category>/<city>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{server.stats}")
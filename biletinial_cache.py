@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# On-disk HTTP response cache used by biletinial_scraper.py.
+# Every entry is two files named after the hash of the normalized URL:
+#   <key>.html  -> response body
+#   <key>.json  -> url, ETag / Last-Modified validators, fetch and last-use times, size
+
+DEFAULT_CACHE_TTL = 15 * 60             # seconds an entry is served without revalidation
+DEFAULT_CACHE_MAX_BYTES = 100 * 1024 * 1024
+
+
+def normalize_url(url):
+    """Lowercases scheme/host, sorts query parameters and drops the fragment so equal URLs share a key."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', query, ''))
+
+
+def cache_key(url):
+    return hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistent response cache with TTL freshness, conditional-request validators
+    and size-bounded LRU eviction. Safe to share between fetch threads.
+    """
+
+    def __init__(self, cache_dir, ttl=DEFAULT_CACHE_TTL, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.index = {}  # key -> metadata dict
+        os.makedirs(cache_dir, exist_ok=True)
+        self.load_index()
+
+    def path(self, key, suffix):
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def load_index(self):
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            key = name[:-len('.json')]
+            try:
+                with open(self.path(key, '.json'), 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if os.path.exists(self.path(key, '.html')):
+                self.index[key] = meta
+
+    def write_meta(self, key, meta):
+        with open(self.path(key, '.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+    def lookup(self, url):
+        """Returns the metadata for `url` (marking it as recently used) or None."""
+        key = cache_key(url)
+        with self.lock:
+            meta = self.index.get(key)
+            if meta is not None:
+                meta['last_used'] = time.time()
+            return meta
+
+    def is_fresh(self, meta):
+        return self.ttl > 0 and time.time() - meta['fetched_at'] < self.ttl
+
+    def read_body(self, url):
+        try:
+            with open(self.path(cache_key(url), '.html'), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def validators(self, meta):
+        """Conditional request headers for revalidating a cached entry."""
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def refresh(self, url, response_headers=None):
+        """Marks an entry as freshly validated after a 304 Not Modified."""
+        key = cache_key(url)
+        with self.lock:
+            meta = self.index.get(key)
+            if meta is None:
+                return
+            meta['fetched_at'] = time.time()
+            if response_headers:
+                meta['etag'] = response_headers.get('ETag', meta.get('etag'))
+                meta['last_modified'] = response_headers.get('Last-Modified', meta.get('last_modified'))
+            self.write_meta(key, meta)
+
+    def store(self, url, body, response_headers):
+        key = cache_key(url)
+        data = body.encode('utf-8')
+        now = time.time()
+        meta = {
+            'url': normalize_url(url),
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified'),
+            'fetched_at': now,
+            'last_used': now,
+            'size': len(data)
+        }
+        with self.lock:
+            with open(self.path(key, '.html'), 'wb') as f:
+                f.write(data)
+            self.write_meta(key, meta)
+            self.index[key] = meta
+            self.evict()
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in max_bytes. Caller holds the lock."""
+        total = sum(meta['size'] for meta in self.index.values())
+        if total <= self.max_bytes:
+            return
+        for key, meta in sorted(self.index.items(), key=lambda item: item[1].get('last_used', 0)):
+            if total <= self.max_bytes:
+                break
+            for suffix in ('.html', '.json'):
+                try:
+                    os.remove(self.path(key, suffix))
+                except OSError:
+                    pass
+            total -= meta['size']
+            del self.index[key]
+
+    def flush(self):
+        """Persists last-use times so LRU order survives between runs."""
+        with self.lock:
+            for key, meta in self.index.items():
+                self.write_meta(key, meta)
@@ -0,0 +1,447 @@
+import argparse
+import io
+import itertools
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import biletinial_dates
+import biletinial_identity
+import biletinial_metrics
+import biletinial_scraper as scraper
+import biletinial_writers
+import etkinlik_planlayici as planlayici
+from biletinial_cache import ResponseCache, DEFAULT_CACHE_TTL, DEFAULT_CACHE_MAX_BYTES
+
+# python biletinial_daemon.py --category both --city antalya --cache-dir cache --refresh-interval 900
+# curl "http://127.0.0.1:8765/plan?start_date=Nisan%2018&min_days=4&format=text"
+#
+# Long-running planner: the events are crawled once at start-up and kept in memory as an
+# EventIndex, then re-crawled every --refresh-interval seconds. With --cache-dir only pages
+# older than --cache-ttl are requested again (conditionally), and listings whose markup did not
+# change are not re-parsed. Plans are served over HTTP (or a Unix socket with --socket):
+#   GET  /plan      start_date ('Nisan 18' or YYYY-MM-DD), end_date, min_days, solver,
+#                   alternatives, exclude (repeatable play name or link), category (repeatable),
+#                   include_sold_out, format (text, jsonl, csv, ics; default jsonl)
+#   GET  /status    showings, last refresh, plan cache and crawl counters as JSON
+#   POST /refresh   re-crawl now
+# Computed plans are kept in an LRU keyed by the request; a refresh drops only the entries
+# whose date window contains a showing that was added, removed or changed. Plans cut short by
+# the time budget are not cached and are answered with X-Plan-Complete: 0.
+
+DEFAULT_PORT = 8765
+DEFAULT_REFRESH_INTERVAL = DEFAULT_CACHE_TTL
+DEFAULT_PLAN_CACHE_SIZE = 256
+
+CONTENT_TYPES = {
+    'text': 'text/plain; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+    'ics': 'text/calendar; charset=utf-8',
+}
+
+
+class PlanCache:
+    """
+    LRU of computed plans keyed by the normalized request. Each entry remembers its date
+    window (first, last day ordinal; None for open ends) so a refresh only evicts the
+    entries that cover a changed day.
+    """
+
+    def __init__(self, max_entries=DEFAULT_PLAN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (first_day, last_day, plans)
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'invalidated': 0, 'evicted': 0}
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[2]
+
+    def put(self, key, first_day, last_day, plans):
+        with self.lock:
+            self.entries[key] = (first_day, last_day, plans)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evicted'] += 1
+
+    def invalidate(self, changed_days):
+        """Drops the entries whose window contains any of `changed_days` (sorted ordinals); returns how many."""
+        if not changed_days:
+            return 0
+        with self.lock:
+            stale = []
+            for key, (first_day, last_day, _) in self.entries.items():
+                position = bisect_left(changed_days, first_day) if first_day is not None else 0
+                if position < len(changed_days) and (last_day is None or changed_days[position] <= last_day):
+                    stale.append(key)
+            for key in stale:
+                del self.entries[key]
+            self.stats['invalidated'] += len(stale)
+            return len(stale)
+
+    def summary(self):
+        with self.lock:
+            return dict(self.stats, entries=len(self.entries))
+
+
+def showing_rows(showings):
+    """index_showings values -> biletinial_store.query_showings rows, ordered like the store returns them."""
+    rows = []
+    for showing in showings.values():
+        prices = showing.get('prices') or [None]
+        rows.append((date.fromisoformat(showing['date']), showing['play'], showing['venue'], showing['category'],
+                     showing['link'], showing.get('showtimes') or [], prices[0], prices[-1], showing.get('sold_out')))
+    rows.sort(key=lambda row: (row[0], row[3], row[1]))
+    return rows
+
+
+def changed_days(delta):
+    """Sorted day ordinals touched by a compute_delta result."""
+    days = {showing['date'] for showing in delta['added'] + delta['removed']}
+    days.update(change['after']['date'] for change in delta['changed'])
+    return sorted(date.fromisoformat(day).toordinal() for day in days)
+
+
+def parse_request_date(value):
+    """'Nisan 18' or 'YYYY-MM-DD' -> date; raises ValueError otherwise."""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    ordinal = biletinial_dates.parse_month_day(value)
+    if ordinal is None:
+        raise ValueError(f"invalid date '{value}', expected 'Nisan 18' or YYYY-MM-DD")
+    return date.fromordinal(ordinal)
+
+
+class PlanService:
+    """
+    The hot event index plus the plan cache. refresh() re-crawls and swaps the index in;
+    plans() answers a request from the cache or computes it on the current index.
+    """
+
+    def __init__(self, crawl, plan_cache_size=DEFAULT_PLAN_CACHE_SIZE, time_budget=planlayici.DEFAULT_TIME_BUDGET,
+                 metrics=None):
+        self.crawl = crawl  # () -> scraper.index_showings result
+        self.time_budget = time_budget
+        self.metrics = metrics or biletinial_metrics.Metrics()
+        self.cache = PlanCache(plan_cache_size)
+        self.index = planlayici.EventIndex([])
+        self.showings = {}
+        self.generation = 0  # bumped whenever the showings change
+        self.refreshed_at = None
+        self.last_delta = None
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+
+    def refresh(self):
+        """Re-crawls, swaps in the new index if anything changed and invalidates the affected plans; returns the delta."""
+        with self.refresh_lock:
+            with self.metrics.stage('refresh'):
+                showings = self.crawl()
+                delta = scraper.compute_delta(self.showings, showings)
+                days = changed_days(delta)
+                index = planlayici.EventIndex(planlayici.events_from_rows(showing_rows(showings))) if days else None
+            with self.lock:
+                if days:
+                    self.index = index
+                    self.showings = showings
+                    self.generation += 1
+                    self.metrics.count('plans_invalidated', self.cache.invalidate(days))
+                self.refreshed_at = time.time()
+                self.last_delta = {kind: len(items) for kind, items in delta.items()}
+            self.metrics.count('refreshes')
+            return delta
+
+    def plans(self, query):
+        """(list of (title, events), served from cache?, complete?) for a parsed /plan query (see plan_request)."""
+        key = tuple(sorted((name, tuple(values) if isinstance(values, list) else values) for name, values in query.items()))
+        plans = self.cache.get(key)
+        if plans is not None:
+            self.metrics.count('plan_cache_hits')
+            return plans, True, True
+
+        with self.lock:
+            index, generation = self.index, self.generation
+        first_day = query['start_date'].toordinal() if query['start_date'] else None
+        last_day = query['end_date'].toordinal() if query['end_date'] else None
+        with self.metrics.stage('plan'):
+            plans, complete = compute_plans(index.window(query['start_date'], query['end_date']), query, self.time_budget)
+        with self.lock:
+            # A refresh that landed meanwhile may have changed this window, so only cache current results;
+            # plans cut short by the time budget are not cached either
+            if generation == self.generation and complete:
+                self.cache.put(key, first_day, last_day, plans)
+        self.metrics.count('plans_computed')
+        if not complete:
+            self.metrics.count('plans_truncated')
+        return plans, False, complete
+
+    def status(self):
+        with self.lock:
+            status = {
+                'showings': len(self.showings),
+                'plays': len(self.index.showings_by_play),
+                'generation': self.generation,
+                'refreshed_at': self.refreshed_at,
+                'last_delta': self.last_delta,
+            }
+        status['plan_cache'] = self.cache.summary()
+        status['metrics'] = self.metrics.snapshot()
+        return status
+
+
+def plan_request(params):
+    """Parses /plan query parameters ({name: [values]}) into the normalized query dict; raises ValueError."""
+    def single(name, default=None):
+        values = params.get(name)
+        return values[-1] if values else default
+
+    query = {
+        'start_date': parse_request_date(single('start_date')) if single('start_date') else None,
+        'end_date': parse_request_date(single('end_date')) if single('end_date') else None,
+        'min_days': int(single('min_days', 4)),
+        'solver': single('solver', 'optimal'),
+        'alternatives': int(single('alternatives', 1)),
+        'exclude': sorted(set(params.get('exclude', []))),
+        'categories': sorted(set(params.get('category', []))),
+        'include_sold_out': single('include_sold_out', '0').lower() in ('1', 'true', 'yes'),
+    }
+    if query['solver'] not in ('optimal', 'greedy'):
+        raise ValueError(f"unknown solver '{query['solver']}'")
+    if query['min_days'] < 0 or query['alternatives'] < 1:
+        raise ValueError("min_days must be >= 0 and alternatives >= 1")
+    return query
+
+
+def compute_plans(events, query, time_budget):
+    """
+    The planner CLI's solver choice for one request, materialized so it can be cached.
+    Returns (list of (title, events), False if the time budget cut the search short).
+    """
+    excluded = biletinial_identity.PlayMatcher(query['exclude'])
+    categories = set(query['categories'])
+    events = [event for event in events
+              if not (excluded and excluded.matches(event['name'], event['link']))
+              and (not categories or event['category'] in categories)
+              and (query['include_sold_out'] or not event.get('sold_out'))]
+    if not events:
+        return [("Önerilen Plan", [])], True
+    if query['alternatives'] > 1:
+        constraints = {'min_days_apart': query['min_days'], 'time_budget': time_budget}
+        search = planlayici.plan(events, constraints)
+        plans = [(f"Alternatif Plan {number} ({alternative.score} oyun)", alternative.events)
+                 for number, alternative in enumerate(itertools.islice(search, query['alternatives']), 1)]
+        return plans, not search.truncated
+    if query['solver'] == 'optimal':
+        planned_events, optimal = planlayici.create_optimal_plan(events, min_days_apart=query['min_days'], time_budget=time_budget)
+        return [("Önerilen Plan", planned_events)], optimal
+    return [("Önerilen Plan", planlayici.create_plan(events, min_days_apart=query['min_days']))], True
+
+
+def render_plans(plans, output_format):
+    output = io.StringIO()
+    if not planlayici.write_plans(output, output_format, plans) and output_format == 'text':
+        planlayici.write_plan(output, [])
+    return output.getvalue()
+
+
+class PlanHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def send_body(self, status, body, content_type='application/json; charset=utf-8', headers=None):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_json(self, status, payload):
+        self.send_body(status, json.dumps(payload, ensure_ascii=False, indent=2) + "\n")
+
+    def request_path(self):
+        # http.server decodes the request line as latin-1; undo that for clients sending raw UTF-8 ("exclude=Terör")
+        try:
+            return self.path.encode('iso-8859-1').decode('utf-8')
+        except UnicodeError:
+            return self.path
+
+    def do_GET(self):
+        url = urlsplit(self.request_path())
+        service = self.server.service
+        if url.path == '/status':
+            self.send_json(200, service.status())
+            return
+        if url.path != '/plan':
+            self.send_json(404, {'error': f"unknown path '{url.path}'"})
+            return
+        params = parse_qs(url.query)
+        output_format = params.get('format', ['jsonl'])[-1]
+        try:
+            if output_format not in biletinial_writers.OUTPUT_FORMATS:
+                raise ValueError(f"unknown format '{output_format}'")
+            query = plan_request(params)
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+            return
+        plans, cached, complete = service.plans(query)
+        self.send_body(200, render_plans(plans, output_format), CONTENT_TYPES[output_format],
+                       {'X-Plan-Cache': 'hit' if cached else 'miss', 'X-Plan-Complete': '1' if complete else '0'})
+
+    def do_POST(self):
+        if urlsplit(self.path).path != '/refresh':
+            self.send_json(404, {'error': f"unknown path '{self.path}'"})
+            return
+        try:
+            delta = self.server.service.refresh()
+        except Exception as e:
+            self.send_json(500, {'error': f"refresh failed, keeping the previous events: {e}"})
+            return
+        self.send_json(200, {kind: len(items) for kind, items in delta.items()})
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class PlanHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service, verbose=False):
+        super().__init__(address, PlanHandler)
+        self.service = service
+        self.verbose = verbose
+
+
+class PlanUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, service, verbose=False):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, PlanHandler)
+        self.service = service
+        self.verbose = verbose
+
+
+def run_scheduler(service, interval, stop, metrics_file=None):
+    """Refreshes every `interval` seconds until `stop` is set; a failed refresh keeps the previous index."""
+    while not stop.wait(interval):
+        try:
+            delta = service.refresh()
+            print(f"Refreshed: {len(delta['added'])} added, {len(delta['removed'])} removed, "
+                  f"{len(delta['changed'])} changed, plan cache {service.cache.summary()}")
+        except Exception as e:
+            print(f"Refresh failed, keeping the previous events: {e}")
+        if metrics_file:
+            biletinial_metrics.write_metrics(metrics_file, service.metrics, 'biletinial_daemon')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep biletinial events in memory, refresh them on a schedule and serve plans over HTTP.")
+    parser.add_argument("--category", required=True, nargs='+', help="Event category slugs; 'both' means tiyatro and opera-bale")
+    parser.add_argument("--city", required=True, nargs='+', help="City slugs swept on every refresh")
+    parser.add_argument("--tiyatro-filmtypeids", nargs='+', default=[], help="List of Theatre Film Type IDs (optional)")
+    parser.add_argument("--opera-filmtypeids", nargs='+', default=[], help="List of Opera/Ballet Film Type IDs (optional)")
+    parser.add_argument("--venue-id", nargs='+', default=[], help="List of Venue IDs (optional, fetches all if omitted)")
+    parser.add_argument("--concurrency", type=int, default=scraper.DEFAULT_CONCURRENCY, help=f"Maximum simultaneous requests (default {scraper.DEFAULT_CONCURRENCY})")
+    parser.add_argument("--rate", type=float, default=scraper.DEFAULT_RATE, help=f"Maximum requests per second per host, 0 for unlimited (default {scraper.DEFAULT_RATE})")
+    parser.add_argument("--cache-dir", default=None, help="On-disk response cache; with it only pages older than --cache-ttl are requested again")
+    parser.add_argument("--cache-ttl", type=int, default=DEFAULT_CACHE_TTL, help=f"Seconds a cached page is used without revalidation (default {DEFAULT_CACHE_TTL})")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024), help="Cache size limit in MB")
+    parser.add_argument("--parser", default="auto", choices=scraper.PARSER_BACKENDS, help="HTML parser backend (default: fastest installed)")
+    parser.add_argument("--parse-workers", type=int, default=scraper.DEFAULT_PARSE_WORKERS, help="Processes parsing pages, 0 parses in the fetch threads")
+    parser.add_argument("--offline", action="store_true", help="Serve pages only from --cache-dir, never touch the network")
+    parser.add_argument("--discover", action="store_true", help="Plan requests from the site's own venue/film type filters")
+    parser.add_argument("--max-pages", type=int, default=scraper.DEFAULT_MAX_PAGES, help=f"Listing pages followed per URL (default {scraper.DEFAULT_MAX_PAGES})")
+    parser.add_argument("--enrich", action="store_true", help="Add showtimes, prices and sold-out status from event detail pages")
+    parser.add_argument("--enrich-cache", default="biletinial_details_cache.json", help="JSON cache of parsed detail pages, reused for --cache-ttl seconds")
+    parser.add_argument("--watched-file", default=scraper.DEFAULT_WATCHED_FILE, help="Plays left out of every plan, one name or link per line ('' for none); re-read on every refresh")
+    parser.add_argument("--refresh-interval", type=float, default=DEFAULT_REFRESH_INTERVAL, help=f"Seconds between scheduled refreshes (default {DEFAULT_REFRESH_INTERVAL})")
+    parser.add_argument("--host", default="127.0.0.1", help="Address the HTTP API listens on (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"HTTP API port (default {DEFAULT_PORT})")
+    parser.add_argument("--socket", default=None, help="Serve the API on this Unix socket instead of --host/--port")
+    parser.add_argument("--plan-cache-size", type=int, default=DEFAULT_PLAN_CACHE_SIZE, help=f"Computed plans kept in memory (default {DEFAULT_PLAN_CACHE_SIZE})")
+    parser.add_argument("--time-budget", type=float, default=planlayici.DEFAULT_TIME_BUDGET, help="Seconds the optimal solver may search per request")
+    parser.add_argument("--metrics-file", default=None, help="Rewritten after every refresh: *.json, *.jsonl or a Prometheus textfile (e.g. *.prom)")
+    parser.add_argument("--verbose", action="store_true", help="Log every API request")
+    args = parser.parse_args()
+    if args.offline and not args.cache_dir:
+        parser.error("--offline requires --cache-dir")
+    if args.watched_file and not os.path.exists(args.watched_file):
+        parser.error(f"--watched-file {args.watched_file} does not exist")
+
+    categories_to_process = []
+    for category in args.category:
+        for slug in (['tiyatro', 'opera-bale'] if category == 'both' else [category]):
+            if slug not in categories_to_process:
+                categories_to_process.append(slug)
+
+    cache = ResponseCache(args.cache_dir, ttl=args.cache_ttl, max_bytes=args.cache_max_mb * 1024 * 1024) if args.cache_dir else None
+    client = scraper.HttpClient(concurrency=args.concurrency, rate=args.rate, cache=cache, offline=args.offline)
+    page_state = {}  # listing fingerprints, unchanged pages are not re-parsed on refresh
+
+    def crawl():
+        grouped_events = scraper.fetch_and_group_events(
+            categories_to_process, args.city, args.venue_id, args.tiyatro_filmtypeids, args.opera_filmtypeids,
+            client=client, parser_backend=args.parser, parse_workers=args.parse_workers, page_state=page_state,
+            discover=args.discover, max_pages=args.max_pages, watched=biletinial_identity.load_watched(args.watched_file))
+        if args.enrich:
+            with client.metrics.stage('enrich'):
+                grouped_events = scraper.enrich_events(grouped_events, client, args.enrich_cache, args.cache_ttl)
+        if cache:
+            cache.flush()
+        return scraper.index_showings(grouped_events)
+
+    service = PlanService(crawl, args.plan_cache_size, args.time_budget, metrics=client.metrics)
+    service.refresh()
+    print(f"Loaded {len(service.showings)} showings ({client.summary()})")
+    if args.metrics_file:
+        biletinial_metrics.write_metrics(args.metrics_file, service.metrics, 'biletinial_daemon')
+
+    if args.socket:
+        server = PlanUnixServer(args.socket, service, args.verbose)
+        print(f"Serving plans on unix:{args.socket}")
+    else:
+        server = PlanHTTPServer((args.host, args.port), service, args.verbose)
+        print(f"Serving plans on http://{args.host}:{server.server_address[1]}/plan")
+
+    # Service managers stop the daemon with SIGTERM; exit through the same cleanup as Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    stop = threading.Event()
+    threading.Thread(target=run_scheduler, args=(service, args.refresh_interval, stop, args.metrics_file), daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        client.close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+    sys.exit(0)
@@ -0,0 +1,120 @@
+from datetime import date, datetime
+from functools import lru_cache
+
+# Shared Turkish date handling for biletinial_scraper.py and etkinlik_planlayici.py.
+# Dates are kept as integer day ordinals (date.toordinal()) so grouping, sorting, range
+# filling and gap checks are plain int operations; every raw string is parsed once and memoized.
+# Listings carry no year: a month/day is placed in the reference year, or in the next one
+# when it would fall more than ROLLOVER_DAYS before the reference day (Aralık -> Ocak).
+
+TURKISH_MONTHS = {
+    "Ocak": "01", "Şubat": "02", "Mart": "03", "Nisan": "04",
+    "Mayıs": "05", "Haziran": "06", "Temmuz": "07", "Ağustos": "08",
+    "Eylül": "09", "Ekim": "10", "Kasım": "11", "Aralık": "12"
+}
+MONTH_NUMBERS = {name: int(number) for name, number in TURKISH_MONTHS.items()}
+MONTH_NAMES = [None] + list(TURKISH_MONTHS)  # month number -> Turkish name
+
+ROLLOVER_DAYS = 60
+
+
+def reference_day():
+    """Today's ordinal, the default reference for resolving the year of a month/day."""
+    return date.today().toordinal()
+
+
+@lru_cache(maxsize=None)
+def month_day_ordinal(month, day, reference):
+    """Ordinal of `day` of month number `month` in the year closest ahead of `reference`, or None."""
+    year = date.fromordinal(reference).year
+    try:
+        ordinal = date(year, month, day).toordinal()
+        if ordinal < reference - ROLLOVER_DAYS:
+            ordinal = date(year + 1, month, day).toordinal()
+    except ValueError:
+        return None
+    return ordinal
+
+
+@lru_cache(maxsize=None)
+def _parse_date_key(date_key, reference):
+    parts = date_key.split(" - ")
+    month = MONTH_NUMBERS.get(parts[0])
+    if not month or len(parts) < 2 or not parts[1].isdigit():
+        return None
+    return month_day_ordinal(month, int(parts[1]), reference)
+
+
+def parse_date_key(date_key, reference=None):
+    """'Nisan - 18' -> day ordinal, or None if it is not a valid Turkish date key."""
+    return _parse_date_key(date_key, reference or reference_day())
+
+
+@lru_cache(maxsize=None)
+def _parse_raw_dates(raw, reference):
+    parts = raw.split(" - ")
+    month = MONTH_NUMBERS.get(parts[0])
+    if not month:
+        return ()
+    dates = []
+    previous_day = 0
+    for part in parts[1:]:
+        day_part = part.split(" ")[0]
+        if day_part.isdigit():
+            day = int(day_part)
+            # Days only run forward within one listing: 'Aralık - 30 - 31 - 01' ends on Ocak 01
+            if day < previous_day:
+                month = month % 12 + 1
+            previous_day = day
+            key = f"{MONTH_NAMES[month]} - {day:02d}"
+            ordinal = _parse_date_key(key, reference)
+            if ordinal is not None:
+                dates.append((key, ordinal))
+    return tuple(dates)
+
+
+def parse_raw_dates(raw, reference=None):
+    """
+    Raw listing date string ('Nisan - 18 Cuma - 19 Cumartesi') -> tuple of
+    ('Nisan - 18', ordinal) pairs. Memoized: listings repeat the same strings a lot.
+    """
+    return _parse_raw_dates(raw, reference or reference_day())
+
+
+@lru_cache(maxsize=None)
+def _parse_month_day(text, reference):
+    parts = text.split()
+    if len(parts) != 2 or not parts[1].isdigit():
+        return None
+    month = MONTH_NUMBERS.get(parts[0].capitalize())
+    if not month:
+        return None
+    return month_day_ordinal(month, int(parts[1]), reference)
+
+
+def parse_month_day(text, reference=None):
+    """'Mayıs 11' (month name in any case) -> day ordinal, or None."""
+    return _parse_month_day(text, reference or reference_day())
+
+
+@lru_cache(maxsize=None)
+def date_key(ordinal):
+    """Day ordinal -> 'Nisan - 18'."""
+    day = date.fromordinal(ordinal)
+    return f"{MONTH_NAMES[day.month]} - {day.day:02d}"
+
+
+@lru_cache(maxsize=None)
+def to_datetime(ordinal):
+    """Day ordinal -> midnight datetime (shared instance; datetimes are immutable)."""
+    return datetime.fromordinal(ordinal)
+
+
+def weekday(ordinal):
+    """Monday is 0, like date.weekday()."""
+    return (ordinal - 1) % 7
+
+
+def week_number(ordinal):
+    """Monday-based week counter; equal for days in the same ISO week."""
+    return (ordinal - 1) // 7
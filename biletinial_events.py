@@ -0,0 +1,120 @@
+from array import array
+
+# Compact in-memory event table shared by biletinial_scraper.py and etkinlik_planlayici.py.
+# Fields are stored column-wise: int fields in array('q') columns, every other field as an
+# index into one interned value pool, so a play, venue or category string is kept once no
+# matter how many events or dates refer to it. Rows are read through Event views, which
+# behave like read-only dicts; a showing is a row's view listed under each date it is on
+# (the scraper's grouped events), so no per-date copy of an event is made.
+
+
+class EventTable:
+    """
+    Columnar event storage. `fields` are pooled (any hashable value), `int_fields` are
+    int columns, `derived` maps a field name to (source field, function) computed on read.
+    With `key_fields`, append() returns the existing row for an already seen key until
+    drop_key_index() is called.
+    """
+
+    def __init__(self, fields, int_fields=(), key_fields=None, derived=None):
+        self.value_columns = {field: array('q') for field in fields}
+        self.int_columns = {field: array('q') for field in int_fields}
+        self.key_positions = [tuple(fields).index(field) for field in key_fields] if key_fields else None
+        self.derived = derived or {}
+        self.field_names = tuple(fields) + tuple(int_fields) + tuple(self.derived)
+        self.values = []       # pool id -> value
+        self.value_ids = {}    # value -> pool id
+        self.row_by_key = {}
+        self.views = []
+
+    def __len__(self):
+        return len(self.views)
+
+    def intern(self, value):
+        value_id = self.value_ids.get(value)
+        if value_id is None:
+            value_id = self.value_ids[value] = len(self.values)
+            self.values.append(value)
+        return value_id
+
+    def append(self, event):
+        """Adds a row from a dict (missing pooled fields are None) and returns its index."""
+        intern = self.intern
+        ids = [intern(event.get(field)) for field in self.value_columns]
+        if self.row_by_key is not None and self.key_positions:
+            key = tuple([ids[position] for position in self.key_positions])
+            row = self.row_by_key.get(key)
+            if row is not None:
+                return row
+            self.row_by_key[key] = len(self.views)
+        for column, value_id in zip(self.value_columns.values(), ids):
+            column.append(value_id)
+        for field, column in self.int_columns.items():
+            column.append(event[field])
+        self.views.append(Event(self, len(self.views)))
+        return len(self.views) - 1
+
+    def drop_key_index(self):
+        """Frees the deduplication index once all rows are in; later appends are not deduplicated."""
+        self.row_by_key = None
+
+    def column(self, field):
+        """All values of one field in row order, without going through Event views."""
+        if field in self.int_columns:
+            return self.int_columns[field]
+        values = self.values
+        return [values[value_id] for value_id in self.value_columns[field]]
+
+    def rows(self):
+        """One shared Event view per row, in insertion order."""
+        return list(self.views)
+
+
+class Event:
+    """Read-only dict-like view of one EventTable row; dict(event) gives a plain copy."""
+
+    __slots__ = ('table', 'row')
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    def __getitem__(self, field):
+        table = self.table
+        column = table.value_columns.get(field)
+        if column is not None:
+            return table.values[column[self.row]]
+        column = table.int_columns.get(field)
+        if column is not None:
+            return column[self.row]
+        if field in table.derived:
+            source, function = table.derived[field]
+            return function(self[source])
+        raise KeyError(field)
+
+    def get(self, field, default=None):
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self.table.field_names
+
+    def items(self):
+        return [(field, self[field]) for field in self.table.field_names]
+
+    def values(self):
+        return [self[field] for field in self.table.field_names]
+
+    def __iter__(self):
+        return iter(self.table.field_names)
+
+    def __len__(self):
+        return len(self.table.field_names)
+
+    def __contains__(self, field):
+        return field in self.table.field_names
+
+    def __repr__(self):
+        return f"Event({dict(self)!r})"
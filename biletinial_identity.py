@@ -0,0 +1,177 @@
+import os
+import re
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+# Play identity shared by biletinial_scraper.py and etkinlik_planlayici.py.
+# The same play shows up as "GRAMOFON HALA ÇALIYOR" and "Gramofon Hala Çalıyor", as
+# "YALANCI - ANTALYA DT" at one venue and "Yalancı" at another, and as /tiyatro/polisler-ast
+# in links. play_key() folds all of these to one key ('gramofon hala caliyor', 'yalanci',
+# 'polisler'); PlayMatcher matches names against a list of plays by key, and by trigram
+# similarity for small spelling differences.
+
+# Turkish letters folded explicitly (dotted/dotless I first, so casefold never sees them),
+# plus the Latin letters NFKD does not decompose
+TURKISH_FOLD = str.maketrans({'ı': 'i', 'İ': 'i', 'I': 'i', 'ş': 's', 'Ş': 's', 'ğ': 'g', 'Ğ': 'g',
+                              'ç': 'c', 'Ç': 'c', 'ö': 'o', 'Ö': 'o', 'ü': 'u', 'Ü': 'u',
+                              'ł': 'l', 'Ł': 'l', 'ø': 'o', 'Ø': 'o', 'đ': 'd', 'Đ': 'd'})
+NON_ALNUM_RE = re.compile(r'[^0-9a-z]+')
+SUBTITLE_RE = re.compile(r'\s*(?:\(.*?\)|\[.*?\]|:.*)\s*')
+
+# Trailing company markers ("- ANTALYA DT", "Tosca Antalya DOB", "polisler-ast", "kugu-golu-adob")
+COMPANY_SUFFIXES = frozenset({
+    'dt', 'dob', 'adob', 'idob', 'izdob', 'mdob', 'sdob', 'ast', 'sht', 'st', 'ibb', 'ibbst', 'bbst', 'bst',
+})
+# A city name right before a company marker is part of the marker ("Antalya DOB")
+CITY_NAMES = frozenset("""
+adana adiyaman afyonkarahisar agri aksaray amasya ankara antalya ardahan artvin aydin balikesir bartin
+batman bayburt bilecik bingol bitlis bolu burdur bursa canakkale cankiri corum denizli diyarbakir duzce
+edirne elazig erzincan erzurum eskisehir gaziantep giresun gumushane hakkari hatay igdir isparta istanbul
+izmir kahramanmaras karabuk karaman kars kastamonu kayseri kilis kirikkale kirklareli kirsehir kocaeli
+konya kutahya malatya manisa mardin mersin mugla mus nevsehir nigde ordu osmaniye rize sakarya samsun
+sanliurfa siirt sinop sirnak sivas tekirdag tokat trabzon tunceli usak van yalova yozgat zonguldak
+""".split())
+
+DEFAULT_SIMILARITY = 0.8  # trigram Dice coefficient above which two keys name the same play
+
+# Watched-list entries that are links rather than names: absolute URLs, paths, and
+# scheme-less 'biletinial.com/...' or 'tr-tr/...' forms. A '/' alone is not enough, play
+# names contain it too ('Aşk/Nefret', 'Kral Lear / Modern').
+LINK_RE = re.compile(r'^(?:[a-z][a-z0-9+.-]*://|/|www\.|[a-z]{2}-[a-z]{2}/)|biletinial\.', re.IGNORECASE)
+
+
+def fold(text):
+    """Turkish-aware casefold with diacritics removed and punctuation collapsed to single spaces."""
+    text = unicodedata.normalize('NFKD', text.translate(TURKISH_FOLD).casefold())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return NON_ALNUM_RE.sub(' ', text).strip()
+
+
+def strip_company_suffix(tokens):
+    """Drops trailing company markers and the city name before them; never returns an empty list."""
+    end = len(tokens)
+    while end > 1 and tokens[end - 1] in COMPANY_SUFFIXES:
+        end -= 1
+    if end < len(tokens) and end > 1 and tokens[end - 1] in CITY_NAMES:
+        end -= 1
+    return tokens[:end]
+
+
+@lru_cache(maxsize=65536)
+def play_key(name):
+    """Identity of a play name: folded, without company/city suffix ('YALANCI - ANTALYA DT' -> 'yalanci')."""
+    return ' '.join(strip_company_suffix(fold(name).split()))
+
+
+@lru_cache(maxsize=65536)
+def base_key(name):
+    """play_key without parenthesised subtitles or anything after ':' ('Therese Raquin (Bir ...)' -> 'therese raquin')."""
+    return play_key(SUBTITLE_RE.sub(' ', name)) or play_key(name)
+
+
+@lru_cache(maxsize=65536)
+def slug_key(link):
+    """play_key of a biletinial link's last path segment ('/tr-tr/tiyatro/polisler-ast' -> 'polisler')."""
+    segments = [segment for segment in urlsplit(link).path.split('/') if segment]
+    return play_key(segments[-1]) if segments else ''
+
+
+def is_link(entry):
+    """True if a watched-list entry is a biletinial link rather than a play name."""
+    return bool(LINK_RE.search(entry))
+
+
+def identity_keys(text, link=False):
+    """Every key a play name (or, with link=True, a biletinial link) is known by."""
+    if link:
+        return {slug_key(text)} - {''}
+    return {play_key(text), base_key(text)} - {''}
+
+
+def number_tokens(key):
+    """The numeric tokens of a key; 'antigone 2' and 'antigone' are different plays however similar."""
+    return tuple(token for token in key.split() if token.isdigit())
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PlayMatcher:
+    """
+    A set of plays (names or links) answering "is this play in the set?" by identity key
+    (hash lookup) or, failing that, by trigram similarity through an inverted trigram index.
+    Answers are memoized per (name, link), so filtering many showings of the same plays
+    costs one dict lookup per event.
+    """
+
+    def __init__(self, entries=(), similarity=DEFAULT_SIMILARITY):
+        self.similarity = similarity
+        self.keys = set()
+        self.trigram_index = defaultdict(set)  # trigram -> keys containing it
+        self.trigram_counts = {}               # key -> number of distinct trigrams
+        self.key_numbers = {}                  # key -> its number_tokens
+        self.memo = {}
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry):
+        for key in identity_keys(entry, link=is_link(entry)):
+            if key in self.keys:
+                continue
+            self.keys.add(key)
+            key_trigrams = trigrams(key)
+            self.trigram_counts[key] = len(key_trigrams)
+            self.key_numbers[key] = number_tokens(key)
+            for trigram in key_trigrams:
+                self.trigram_index[trigram].add(key)
+        self.memo.clear()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __bool__(self):
+        return bool(self.keys)
+
+    def matches(self, name, link=None):
+        """True if the play `name` (optionally its `link`) is one of the entries."""
+        memo_key = (name, link)
+        matched = self.memo.get(memo_key)
+        if matched is None:
+            keys = identity_keys(name) | (identity_keys(link, link=True) if link else set())
+            matched = bool(keys & self.keys) or any(self.similar(key) for key in keys)
+            self.memo[memo_key] = matched
+        return matched
+
+    def similar(self, key):
+        """
+        True if some entry key shares enough trigrams with `key` (Dice coefficient >= similarity)
+        and has the same numbers ('antigone 2' never matches 'antigone' or 'antigone 3').
+        """
+        key_trigrams = trigrams(key)
+        key_numbers = number_tokens(key)
+        shared = defaultdict(int)
+        for trigram in key_trigrams:
+            for candidate in self.trigram_index.get(trigram, ()):
+                shared[candidate] += 1
+        return any(2 * count / (len(key_trigrams) + self.trigram_counts[candidate]) >= self.similarity
+                   and self.key_numbers[candidate] == key_numbers
+                   for candidate, count in shared.items())
+
+
+def load_watched(filename):
+    """
+    Reads a watched-list file: one play name or biletinial link per line, '#' starts a comment.
+    A missing file is an empty list.
+    """
+    entries = []
+    if filename and os.path.exists(filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                entry = line.split('#', 1)[0].strip()
+                if entry:
+                    entries.append(entry)
+    return PlayMatcher(entries)
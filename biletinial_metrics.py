@@ -0,0 +1,187 @@
+import atexit
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Run instrumentation shared by biletinial_scraper.py and etkinlik_planlayici.py:
+# thread-safe counters and per-stage timers, exported as a Prometheus textfile
+# (node_exporter textfile collector) or as JSON, plus an optional whole-run cProfile dump.
+
+METRICS_PREFIX = 'biletinial'
+PROFILE_TOP = 25  # functions printed from the profile, by cumulative time
+
+# Help text for the counters the scraper and planner record; unknown names are exported too
+COUNTER_HELP = {
+    'requests': 'HTTP requests sent',
+    'failures': 'Pages that could not be fetched',
+    'timeouts': 'Requests that timed out',
+    'retries': 'Retries made by the session after connection errors or retryable statuses',
+    'bytes': 'Decoded response body bytes received',
+    'cache_hits': 'Pages served from the response cache without a request',
+    'not_modified': 'Cached pages revalidated with 304 Not Modified',
+    'cache_misses': 'Pages missing from the response cache',
+    'pagination_pages': 'Extra listing pages followed through pagination',
+    'pages_parsed': 'Listing pages parsed',
+    'pages_unchanged': 'Listing pages whose events were reused because the listing did not change',
+    'pages_stale': 'Failed listing pages whose events were reused from the last run',
+    'events_parsed': 'Events extracted from listing pages',
+    'showings': 'Showings (event x date) after grouping',
+    'detail_pages': 'Event detail pages fetched',
+    'details_cached': 'Event detail pages served from the details cache',
+    'showings_written': 'Records written to the output file',
+    'events': 'Events loaded for planning',
+    'plans': 'Plans written',
+}
+
+
+class Metrics:
+    """
+    Counters and stage timers for one run. `stage(name)` times a block (wall clock, summed
+    over calls, so stages run by several threads add up their busy time); `count` adds to a counter.
+    """
+
+    def __init__(self):
+        self.counters = defaultdict(int)
+        self.timers = defaultdict(float)
+        self.timer_calls = defaultdict(int)
+        self.lock = threading.Lock()
+        self.started = time.time()
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def add_time(self, name, seconds, calls=1):
+        with self.lock:
+            self.timers[name] += seconds
+            self.timer_calls[name] += calls
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def snapshot(self):
+        """Plain-dict view of the run: counters, {stage: {'seconds', 'calls'}} and the total duration."""
+        with self.lock:
+            return {
+                'started_at': self.started,
+                'duration_seconds': time.time() - self.started,
+                'counters': dict(self.counters),
+                'stages': {name: {'seconds': self.timers[name], 'calls': self.timer_calls[name]} for name in self.timers}
+            }
+
+    def summary(self):
+        """'fetch 1.20s (12), parse 0.30s (12), ...' in the order the stages were first entered."""
+        with self.lock:
+            return ', '.join(f"{name} {self.timers[name]:.2f}s ({self.timer_calls[name]})" for name in self.timers)
+
+
+def prometheus_lines(snapshot, job, prefix=METRICS_PREFIX):
+    labels = f'job="{job}"'
+    lines = [
+        f"# HELP {prefix}_run_duration_seconds Wall-clock duration of the run",
+        f"# TYPE {prefix}_run_duration_seconds gauge",
+        f"{prefix}_run_duration_seconds{{{labels}}} {snapshot['duration_seconds']:.6f}",
+        f"# HELP {prefix}_last_run_timestamp_seconds Unix time the run finished",
+        f"# TYPE {prefix}_last_run_timestamp_seconds gauge",
+        f"{prefix}_last_run_timestamp_seconds{{{labels}}} {snapshot['started_at'] + snapshot['duration_seconds']:.3f}",
+    ]
+    if snapshot['stages']:
+        lines.append(f"# HELP {prefix}_stage_seconds Time spent per stage, summed over threads and calls")
+        lines.append(f"# TYPE {prefix}_stage_seconds gauge")
+        for name, stage in sorted(snapshot['stages'].items()):
+            lines.append(f'{prefix}_stage_seconds{{{labels},stage="{name}"}} {stage["seconds"]:.6f}')
+        lines.append(f"# HELP {prefix}_stage_calls Times each stage was entered")
+        lines.append(f"# TYPE {prefix}_stage_calls gauge")
+        for name, stage in sorted(snapshot['stages'].items()):
+            lines.append(f'{prefix}_stage_calls{{{labels},stage="{name}"}} {stage["calls"]}')
+    for name, value in sorted(snapshot['counters'].items()):
+        # Counters restart with every run, so they are exported as gauges of the last run
+        metric = f"{prefix}_{name}"
+        lines.append(f"# HELP {metric} {COUNTER_HELP.get(name, name.replace('_', ' '))} in the last run")
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric}{{{labels}}} {value}")
+    return lines
+
+
+def write_metrics(filename, metrics, job):
+    """
+    Exports `metrics` by file extension: '.json' is overwritten with the snapshot, '.jsonl'
+    gets one line appended per run (a history to chart), anything else (e.g. '.prom') is a
+    Prometheus textfile. Files are replaced atomically so a collector never reads half a run.
+    """
+    snapshot = dict(metrics.snapshot(), job=job)
+    if filename.endswith('.jsonl'):
+        with open(filename, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(snapshot, ensure_ascii=False) + "\n")
+        return
+    if filename.endswith('.json'):
+        content = json.dumps(snapshot, ensure_ascii=False, indent=2) + "\n"
+    else:
+        content = "\n".join(prometheus_lines(snapshot, job)) + "\n"
+    temporary = f"{filename}.{os.getpid()}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(temporary, filename)
+
+
+class RunProfiler:
+    """
+    cProfile over the main thread and every thread started while it is on (the fetch pools);
+    before Python 3.12 each thread needs its own profiler, their stats are merged on stop.
+    Parse worker processes are not covered, profile with --parse-workers 0 to include parsing.
+    """
+
+    def __init__(self):
+        self.profilers = []
+        self.lock = threading.Lock()
+
+    def new_profiler(self):
+        profiler = cProfile.Profile()
+        with self.lock:
+            self.profilers.append(profiler)
+        return profiler
+
+    def start(self):
+        # From 3.12 cProfile hooks sys.monitoring, which already sees every thread
+        if sys.version_info < (3, 12):
+            threading.setprofile(self.profile_thread)
+        self.new_profiler().enable()
+
+    def profile_thread(self, frame, event, arg):
+        # Called once at the start of a new thread, then replaced by that thread's profiler
+        sys.setprofile(None)
+        self.new_profiler().enable()
+
+    def stop(self, filename, top=PROFILE_TOP, stream=None):
+        """Dumps the merged stats to `filename` and prints the `top` functions by cumulative time."""
+        threading.setprofile(None)
+        self.profilers[0].disable()
+        report = io.StringIO()
+        stats = pstats.Stats(self.profilers[0], stream=report)
+        for profiler in self.profilers[1:]:
+            stats.add(profiler)
+        stats.dump_stats(filename)
+        stats.sort_stats('cumulative').print_stats(top)
+        stream = stream or sys.stderr
+        stream.write(report.getvalue())
+        stream.write(f"Profile written to {filename} (open with pstats, snakeviz, or flameprof for a flame graph)\n")
+
+
+def start_profiling(filename, top=PROFILE_TOP):
+    """Profiles the rest of the process; the report is written at exit, whichever sys.exit path is taken."""
+    profiler = RunProfiler()
+    profiler.start()
+    atexit.register(profiler.stop, filename, top)
+    return profiler
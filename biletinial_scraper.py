@@ -1,13 +1,42 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+from biletinial_cache import ResponseCache, DEFAULT_CACHE_TTL, DEFAULT_CACHE_MAX_BYTES, normalize_url
+import biletinial_store
+import biletinial_dates
+import biletinial_events
+import biletinial_identity
+import biletinial_metrics
+import biletinial_writers
+from biletinial_dates import TURKISH_MONTHS
 import argparse
 import time
-from urllib.parse import urlencode, urljoin
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from urllib.parse import urlencode, urljoin, urlparse
+from html import unescape
 from collections import defaultdict
+from itertools import zip_longest
 import re
-from datetime import datetime, timedelta
+import hashlib
+import json
+import sys
 import locale # Keep for potential future use, though manual parsing is primary
 
+# Optional faster HTML parsers, html.parser is always available as a fallback
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
 # python biletinial_scraper.py --category both --city antalya --venue-id 20494 2174 1271 --tiyatro-filmtypeids 490 684 688 689 692 569 --opera-filmtypeids 520; "(Roo/PS Workaround: 31)" > $null; start-sleep -milliseconds 150
 
 # Selectors based on Tiyatro page inspection (May need adjustment for other categories)
@@ -15,6 +44,30 @@ DATE_TEXT_SELECTOR = 'li > span' # Contains Month - Day(s)
 EVENT_ITEM_SELECTOR = '#kategori__etkinlikler > ul > li'
 PLAY_NAME_SELECTOR = 'li h3 a' # Selector for the <a> tag containing the name and link
 VENUE_NAME_SELECTOR = 'li address small'
+# Container of the listing; everything outside it is ignored when parsing only the listing subtree
+LISTING_CONTAINER_ID = 'kategori__etkinlikler'
+LISTING_STRAINER = SoupStrainer(id=LISTING_CONTAINER_ID)
+# Used to cut the listing block out of the raw HTML for change detection
+LISTING_BLOCK_START_RE = re.compile(r'<div\b[^>]*\bid=["\']?' + LISTING_CONTAINER_ID + r'\b', re.IGNORECASE)
+DIV_TAG_RE = re.compile(r'<(/?)div\b', re.IGNORECASE)
+
+PARSER_BACKENDS = ('auto', 'selectolax', 'lxml', 'html.parser')
+
+# Columns of the event table built by fetch_and_group_events; a showing is unique per key.
+# 'source' is the listing URL the showing came from (see fetch_and_group_events)
+EVENT_FIELDS = ('date', 'play', 'venue', 'category', 'link_relative', 'source')
+EVENT_KEY_FIELDS = ('link_relative', 'date', 'venue', 'category')
+
+# Pagination and filter discovery, matched with regexes so no extra HTML parse is needed per page
+DEFAULT_MAX_PAGES = 20  # listing pages followed per URL (rel=next / "load more")
+NEXT_LINK_RE = re.compile(r'<(?:a|link)\b[^>]*\brel=["\']?next\b[^>]*>', re.IGNORECASE)
+LOAD_MORE_RE = re.compile(r'\bdata-(?:next-url|next-page-url|load-more-url)=["\']([^"\']+)["\']', re.IGNORECASE)
+HREF_RE = re.compile(r'\bhref=["\']([^"\']+)["\']', re.IGNORECASE)
+FILTER_LINK_RE = re.compile(r'<a\b[^>]*\bhref=["\'][^"\']*[?&;](loc|filmtypeid)=(\d+)[^"\']*["\'][^>]*>(.*?)</a>', re.IGNORECASE | re.DOTALL)
+FILTER_SELECT_RE = re.compile(r'<select\b[^>]*\bname=["\']?(loc|filmtypeid)\b[^>]*>(.*?)</select>', re.IGNORECASE | re.DOTALL)
+FILTER_OPTION_RE = re.compile(r'<option\b[^>]*\bvalue=["\']?(\d+)["\']?[^>]*>(.*?)</option>', re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r'<[^>]+>')
+FILTER_KINDS = {'loc': 'venues', 'filmtypeid': 'filmtypes'}
 
 # Base URL - Now constructed dynamically
 BASE_URL_FORMAT = 'https://biletinial.com/tr-tr/{category}/'
@@ -24,16 +77,42 @@ BASE_DOMAIN = 'https://biletinial.com'
 # User Agent
 USER_AGENT = 'Mozilla/5.0 (compatible; TheatreScraperBot/1.0; +http://example.com/botinfo)'
 
-# Turkish Month Name to Number Mapping
-TURKISH_MONTHS = {
-    "Ocak": "01", "Şubat": "02", "Mart": "03", "Nisan": "04",
-    "Mayıs": "05", "Haziran": "06", "Temmuz": "07", "Ağustos": "08",
-    "Eylül": "09", "Ekim": "10", "Kasım": "11", "Aralık": "12"
-}
+# Politeness budget for the fetch engine
+DEFAULT_RATE = 1.0       # requests per second, per host (0 disables the limit)
+DEFAULT_CONCURRENCY = 4  # maximum number of requests in flight
+DEFAULT_PARSE_WORKERS = os.cpu_count() or 1  # processes running extract_events, 0 parses in the fetch threads
+PARSE_QUEUE_PER_WORKER = 2  # fetched pages allowed to wait per parse worker before fetchers block
+# Parse workers are started while fetch threads (or the daemon's threads) are running and may
+# hold locks; a plain fork would copy those locks held into the child. forkserver forks from a
+# clean single-threaded server process (spawn where forkserver is not available).
+PARSE_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# Session / retry settings
+REQUEST_TIMEOUT = 20
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5      # seconds, doubled on every retry
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
 
-watched_plays = [
-    'Polisler', 'THERESE RAQUIN (BİR CİNAYETİN ANATOMİSİ)', 'Antigone', 'GRAMOFON HALA ÇALIYOR'
-]
+# urllib3 only decodes brotli responses when a brotli package is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+# Detail page enrichment: showtimes, prices, duration and sold-out markers read from the page text
+DETAIL_SESSION_DATE_RE = re.compile(r'\b(\d{1,2})\s+(' + '|'.join(TURKISH_MONTHS) + r')\b')
+DETAIL_SHOWTIME_RE = re.compile(r'\b([01]?\d|2[0-3])[:.]([0-5]\d)\b')
+DETAIL_PRICE_RE = re.compile(r'(\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{1,2})?)\s*(?:TL|₺)', re.IGNORECASE)
+DETAIL_DURATION_RE = re.compile(r'(\d{2,3})\s*(?:dk|dakika)\b', re.IGNORECASE)
+DETAIL_SOLD_OUT_RE = re.compile(r'tükendi|satışa kapalı', re.IGNORECASE)
+DETAIL_SCRIPT_RE = re.compile(r'<(script|style)\b.*?</\1>', re.IGNORECASE | re.DOTALL)
+DETAIL_SESSION_WINDOW = 160  # characters after a session date searched for its time and sold-out marker
+
+# Plays left out of the results, one name or link per line (see biletinial_identity.load_watched);
+# matched by play identity, so case, Turkish letters and company suffixes do not matter
+DEFAULT_WATCHED_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'watched_plays.txt')
+watched_plays = biletinial_identity.load_watched(DEFAULT_WATCHED_FILE)
 
 def build_url(category, city, date_filter='', type_id=0, venue_id=''):
     """Constructs the target URL for biletinial.com listings."""
@@ -71,42 +150,215 @@ def build_url(category, city, date_filter='', type_id=0, venue_id=''):
     else:
         return city_url
 
-def fetch_html(url):
-    """Fetches HTML content from the given URL."""
+class TokenBucket:
+    """Thread-safe token bucket: refills `rate` tokens per second up to `capacity`."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available. A non-positive rate never blocks."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """Keeps one token bucket per host so every worker shares the same politeness budget."""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.rate, self.burst)
+        bucket.acquire()
+
+
+def create_session(pool_size=DEFAULT_CONCURRENCY, max_retries=MAX_RETRIES):
+    """
+    Creates a keep-alive session whose connection pool is sized to the crawl concurrency.
+    Failed requests (connection errors, timeouts, RETRY_STATUS_CODES) are retried with
+    exponential backoff, honouring the server's Retry-After header.
+    """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry, pool_block=True)
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': USER_AGENT,
+        'Accept-Encoding': ACCEPT_ENCODING,
+        'Connection': 'keep-alive'
+    })
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class HttpClient:
+    """
+    Shared session, per-host rate limiter, optional on-disk response cache and
+    request counters / stage timers (`metrics`) for one crawl. In offline mode only the cache is consulted.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE, max_retries=MAX_RETRIES,
+                 cache=None, offline=False):
+        self.concurrency = max(1, concurrency)
+        self.session = create_session(self.concurrency, max_retries)
+        self.rate_limiter = RateLimiter(rate)
+        self.cache = cache
+        self.offline = offline
+        self.metrics = biletinial_metrics.Metrics()
+        self.stats = self.metrics.counters
+
+    def count(self, name, amount=1):
+        self.metrics.count(name, amount)
+
+    def get(self, url, headers=None):
+        """Rate-limited GET through the pooled session; time waiting for the rate limiter counts as 'throttle'."""
+        with self.metrics.stage('throttle'):
+            self.rate_limiter.acquire(url)
+        self.count('requests')
+        with self.metrics.stage('fetch'):
+            response = self.session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        self.count('bytes', len(response.content))
+        retries = getattr(response.raw, 'retries', None)
+        if retries and retries.history:
+            self.count('retries', len(retries.history))
+        return response
+
+    def connection_stats(self):
+        """Returns (opened, reused) connection counts summed over every pool of the session."""
+        opened = reused = 0
+        # The same adapter is mounted for http:// and https://, count it once
+        for adapter in {id(a): a for a in self.session.adapters.values()}.values():
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                opened += pool.num_connections
+                reused += max(0, pool.num_requests - pool.num_connections)
+        return opened, reused
+
+    def summary(self):
+        opened, reused = self.connection_stats()
+        summary = (f"{self.stats['requests']} requests, {self.stats['failures']} failed, "
+                   f"{self.stats['retries']} retries, {opened} connections opened, {reused} reused")
+        if self.cache:
+            summary += (f", cache: {self.stats['cache_hits']} hits, {self.stats['not_modified']} not modified, "
+                        f"{self.stats['cache_misses']} misses")
+        if self.stats['pages_unchanged'] or self.stats['pages_stale']:
+            summary += (f", {self.stats['pages_unchanged']} pages unchanged, "
+                        f"{self.stats['pages_stale']} failed pages reused from the last run")
+        if self.stats['detail_pages'] or self.stats['details_cached']:
+            summary += (f", details: {self.stats['detail_pages']} pages fetched, "
+                        f"{self.stats['details_cached']} from the details cache")
+        return summary
+
+    def close(self):
+        if self.cache:
+            self.cache.flush()
+        self.session.close()
+
+
+# Used when fetch_html is called without an explicit client
+default_client = HttpClient()
+
+def fetch_html(url, client=None):
+    """
+    Fetches HTML content from the given URL through the shared, rate-limited session.
+    Fresh cached pages are returned without a request; stale ones are revalidated
+    with If-None-Match / If-Modified-Since.
+    """
     #print(f"Fetching URL: {url}")
-    headers = {'User-Agent': USER_AGENT}
+    client = client or default_client
+    cache = client.cache
+    cached = cache.lookup(url) if cache else None
+    if cached and (client.offline or cache.is_fresh(cached)):
+        body = cache.read_body(url)
+        if body is not None:
+            client.count('cache_hits')
+            return body
+    if client.offline:
+        print(f"Warning: {url} is not in the cache (offline mode)")
+        client.count('cache_misses')
+        return None
+
     try:
-        time.sleep(1)
-        response = requests.get(url, headers=headers, timeout=20)
+        response = client.get(url, headers=cache.validators(cached) if cached else None)
+        if response.status_code == 304 and cached:
+            body = cache.read_body(url)
+            if body is not None:
+                cache.refresh(url, response.headers)
+                client.count('not_modified')
+                return body
+            response = client.get(url)
         response.raise_for_status()
         if 'text/html' not in response.headers.get('Content-Type', ''):
              print(f"Warning: Expected HTML content, but got {response.headers.get('Content-Type')} for {url}")
+             client.count('failures')
              return None
+        if cache:
+            client.count('cache_misses')
+            cache.store(url, response.text, response.headers)
         return response.text
     except requests.exceptions.Timeout:
         print(f"Error: Request timed out for {url}")
-        return None
+        client.count('timeouts')
     except requests.exceptions.RequestException as e:
         print(f"Error fetching URL {url}: {e}")
-        return None
     except Exception as e:
         print(f"An unexpected error occurred during fetch for {url}: {e}")
-        return None
+    client.count('failures')
+    return None
 
 
-def extract_events(html_content, category):
-    """Extracts event data from HTML content, including the category and link."""
-    if not html_content:
-        return []
+def resolve_parser_backend(backend='auto'):
+    """Returns the concrete backend for `backend`, picking the fastest installed one for 'auto'."""
+    if backend == 'auto':
+        if SelectolaxParser is not None:
+            return 'selectolax'
+        return 'lxml' if LXML_AVAILABLE else 'html.parser'
+    if backend == 'selectolax' and SelectolaxParser is None:
+        raise ValueError("selectolax backend requested but selectolax is not installed")
+    if backend == 'lxml' and not LXML_AVAILABLE:
+        raise ValueError("lxml backend requested but lxml is not installed")
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend '{backend}'")
+    return backend
 
-    soup = BeautifulSoup(html_content, 'html.parser')
-    extracted_events = []
-    event_items = soup.select(EVENT_ITEM_SELECTOR)
-
-    if not event_items:
-        return []
+def iter_listing_rows_soup(html_content, parser_name, listing_only):
+    """Yields (play_name, link, venue, date_str) per listing item using BeautifulSoup."""
+    parse_only = LISTING_STRAINER if listing_only else None
+    soup = BeautifulSoup(html_content, parser_name, parse_only=parse_only)
 
-    for event in event_items:
+    for event in soup.select(EVENT_ITEM_SELECTOR):
         play_name_tag = event.select_one(PLAY_NAME_SELECTOR) # Select the <a> tag
         play_name = play_name_tag.text.strip() if play_name_tag else "N/A"
         play_link_relative = play_name_tag['href'] if play_name_tag and play_name_tag.has_attr('href') else None # Get href
@@ -115,8 +367,46 @@ def extract_events(html_content, category):
         venue_name = venue_name_tag.text.strip() if venue_name_tag else "N/A"
         date_tag = event.select_one(DATE_TEXT_SELECTOR)
         date_str = ' '.join(date_tag.text.split()) if date_tag else "N/A"
+        yield play_name, play_link_relative, venue_name, date_str
+
+def iter_listing_rows_selectolax(html_content, listing_only):
+    """Yields (play_name, link, venue, date_str) per listing item using selectolax (lexbor)."""
+    tree = SelectolaxParser(html_content)
+    root = tree
+    if listing_only:
+        root = tree.css_first('#' + LISTING_CONTAINER_ID)
+        if root is None:
+            return
+
+    for event in root.css(EVENT_ITEM_SELECTOR):
+        play_name_tag = event.css_first(PLAY_NAME_SELECTOR)
+        play_name = play_name_tag.text().strip() if play_name_tag else "N/A"
+        play_link_relative = play_name_tag.attributes.get('href') if play_name_tag else None
+
+        venue_name_tag = event.css_first(VENUE_NAME_SELECTOR)
+        venue_name = venue_name_tag.text().strip() if venue_name_tag else "N/A"
+        date_tag = event.css_first(DATE_TEXT_SELECTOR)
+        date_str = ' '.join(date_tag.text().split()) if date_tag else "N/A"
+        yield play_name, play_link_relative, venue_name, date_str
+
+def extract_events(html_content, category, backend='auto', listing_only=True):
+    """
+    Extracts event data from HTML content, including the category and link.
+    `backend` selects the HTML parser ('auto', 'selectolax', 'lxml' or 'html.parser');
+    with `listing_only` only the #kategori__etkinlikler subtree is parsed.
+    """
+    if not html_content:
+        return []
+
+    backend = resolve_parser_backend(backend)
+    if backend == 'selectolax':
+        rows = iter_listing_rows_selectolax(html_content, listing_only)
+    else:
+        rows = iter_listing_rows_soup(html_content, backend, listing_only)
 
-        if play_name != "N/A" and venue_name != "N/A" and date_str != "N/A" and play_link_relative and play_name not in watched_plays:
+    extracted_events = []
+    for play_name, play_link_relative, venue_name, date_str in rows:
+        if play_name != "N/A" and venue_name != "N/A" and date_str != "N/A" and play_link_relative:
             extracted_events.append({
                 'date': date_str,
                 'play': play_name,
@@ -132,12 +422,177 @@ def extract_events(html_content, category):
 # format_output is not used for grouped output
 # def format_output(events_list): ...
 
-def fetch_and_group_events(categories_to_process, city, venue_ids, tiyatro_filmtypeids, opera_filmtypeids, date_filter=''):
+def listing_block(html_content):
     """
-    Fetches events for specified categories, venues, and film types,
-    aggregates the results, and structures them by date.
+    Returns the raw #kategori__etkinlikler <div> markup (matching nested <div> tags with a regex,
+    no HTML parse), or the whole page when the container is missing.
+    """
+    start_match = LISTING_BLOCK_START_RE.search(html_content)
+    if not start_match:
+        return html_content
+    depth = 0
+    for tag in DIV_TAG_RE.finditer(html_content, start_match.start()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            tag_end = html_content.find('>', tag.end())
+            return html_content[start_match.start():tag_end + 1 if tag_end != -1 else len(html_content)]
+    return html_content[start_match.start():]
+
+def listing_fingerprint(pages):
+    """
+    Fingerprint of a listing: the hash of each page's listing block, combined, so a change on any
+    page of a paginated listing is seen (a single page hashes to its block's hash alone).
+    """
+    digests = [hashlib.sha256(listing_block(html).encode('utf-8')).hexdigest() for html in pages]
+    if len(digests) == 1:
+        return digests[0]
+    return hashlib.sha256(' '.join(digests).encode('ascii')).hexdigest()
+
+def find_next_page_url(html_content, page_url):
+    """Returns the absolute URL of the next listing page (rel="next" link or a "load more" data attribute), if any."""
+    for tag in NEXT_LINK_RE.finditer(html_content):
+        href = HREF_RE.search(tag.group(0))
+        if href:
+            return urljoin(page_url, unescape(href.group(1)))
+    load_more = LOAD_MORE_RE.search(html_content)
+    if load_more:
+        return urljoin(page_url, unescape(load_more.group(1)))
+    return None
+
+def fetch_listing_pages(url, client, max_pages=DEFAULT_MAX_PAGES, first_page=None):
+    """
+    Fetches a listing and follows its pagination. Returns (HTML of every page fetched, complete?);
+    complete is False when any page, not only the first, failed to download.
+    `first_page` is the listing's HTML when it was already downloaded (e.g. during discovery).
+    """
+    pages = []
+    seen_urls = {normalize_url(url)}
+    while url and len(pages) < max_pages:
+        html = first_page if first_page and not pages else fetch_html(url, client)
+        if not html:
+            return pages, False
+        pages.append(html)
+        url = find_next_page_url(html, url)
+        if url:
+            key = normalize_url(url)
+            if key in seen_urls:
+                break
+            seen_urls.add(key)
+            client.count('pagination_pages')
+    return pages, True
+
+def extract_events_from_pages(pages, category, backend='auto'):
+    """extract_events over every page of a paginated listing."""
+    events = []
+    for html in pages:
+        events.extend(extract_events(html, category, backend=backend))
+    return events
+
+def timed_extract_events_from_pages(pages, category, backend='auto'):
+    """(extract_events_from_pages result, seconds spent), so parse time can be reported from worker processes."""
+    started = time.perf_counter()
+    events = extract_events_from_pages(pages, category, backend)
+    return events, time.perf_counter() - started
+
+def discover_filters(html_content):
+    """
+    Reads the venue (loc) and film type (filmtypeid) filters offered by a listing page,
+    from filter links and <select> options. Returns {'venues': {id: name}, 'filmtypes': {id: name}}.
+    """
+    filters = {'venues': {}, 'filmtypes': {}}
+    for param, filter_id, label in FILTER_LINK_RE.findall(html_content):
+        name = ' '.join(unescape(TAG_RE.sub(' ', label)).split())
+        if name:
+            filters[FILTER_KINDS[param.lower()]].setdefault(filter_id, name)
+    for param, options in FILTER_SELECT_RE.findall(html_content):
+        for filter_id, label in FILTER_OPTION_RE.findall(options):
+            name = ' '.join(unescape(TAG_RE.sub(' ', label)).split())
+            if name:
+                filters[FILTER_KINDS[param.lower()]].setdefault(filter_id, name)
+    return filters
+
+def fetch_and_parse_pages(targets, client, parser_backend='auto', parse_workers=DEFAULT_PARSE_WORKERS, page_state=None,
+                          max_pages=DEFAULT_MAX_PAGES, prefetched=None, failed_urls=None):
     """
-    all_events = []
+    Producer/consumer pipeline: fetch threads download pages and hand the HTML to a
+    process pool running extract_events, so parsing never stalls the crawler.
+    At most parse_workers * PARSE_QUEUE_PER_WORKER pages wait for a parser; beyond that
+    the fetch threads block (backpressure). Each target's pagination is followed up to
+    `max_pages` pages. Returns event lists in `targets` order.
+
+    With `page_state` (url -> {'fingerprint', 'events'} from the previous run, updated in place)
+    listings whose blocks are unchanged on every page, or that failed to download on any page,
+    reuse their previous events. `prefetched` (url -> HTML, consumed) supplies first pages that
+    were already downloaded. The URLs of listings that failed on any page are added to `failed_urls`.
+    """
+    prefetched = prefetched if prefetched is not None else {}
+
+    def fetch_page(target):
+        """Returns (pages to parse or None, fingerprint, events reused without parsing or None)."""
+        url = target[1]
+        pages, complete = fetch_listing_pages(url, client, max_pages, prefetched.pop(url, None))
+        previous = page_state.get(url) if page_state is not None else None
+        if not complete:
+            if failed_urls is not None:
+                failed_urls.add(url)
+            if previous:
+                client.count('pages_stale')
+                return None, previous['fingerprint'], previous['events']
+            if not pages:
+                return None, None, []
+            # No earlier run to fall back on: parse the pages that did arrive, but record no
+            # fingerprint so the listing is fetched and parsed in full next time
+            return pages, None, None
+        fingerprint = listing_fingerprint(pages) if page_state is not None else None
+        if previous and previous['fingerprint'] == fingerprint:
+            client.count('pages_unchanged')
+            return None, fingerprint, previous['events']
+        return pages, fingerprint, None
+
+    def record_parse(page_count, parsed):
+        events, seconds = parsed
+        client.metrics.add_time('parse', seconds, page_count)
+        client.count('pages_parsed', page_count)
+        client.count('events_parsed', len(events))
+        return events
+
+    if parse_workers <= 0:
+        def fetch_and_parse(target):
+            pages, fingerprint, events = fetch_page(target)
+            if events is None:
+                events = record_parse(len(pages), timed_extract_events_from_pages(pages, target[0], parser_backend))
+            return fingerprint, events
+
+        with ThreadPoolExecutor(max_workers=client.concurrency) as fetch_pool:
+            results = list(fetch_pool.map(fetch_and_parse, targets))
+    else:
+        parse_slots = threading.BoundedSemaphore(parse_workers * PARSE_QUEUE_PER_WORKER)
+
+        with ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context(PARSE_START_METHOD)) as parse_pool, \
+                ThreadPoolExecutor(max_workers=client.concurrency) as fetch_pool:
+            def fetch_and_submit(target):
+                pages, fingerprint, events = fetch_page(target)
+                if events is not None:
+                    return fingerprint, events
+                parse_slots.acquire()
+                future = parse_pool.submit(timed_extract_events_from_pages, pages, target[0], parser_backend)
+                future.add_done_callback(lambda _: parse_slots.release())
+                # Only the page count is kept; the HTML is released once the parse worker has it
+                return fingerprint, (len(pages), future)
+
+            fetched = [future.result() for future in [fetch_pool.submit(fetch_and_submit, target) for target in targets]]
+            results = [(fingerprint, events if isinstance(events, list) else record_parse(events[0], events[1].result()))
+                       for fingerprint, events in fetched]
+
+    if page_state is not None:
+        for (category, url), (fingerprint, events) in zip(targets, results):
+            if fingerprint:
+                page_state[url] = {'fingerprint': fingerprint, 'events': events}
+    return [events for fingerprint, events in results]
+
+def plan_fetch_targets(categories_to_process, city, venue_ids, tiyatro_filmtypeids, opera_filmtypeids, date_filter=''):
+    """Builds the (category, url) list covering every category × filmtypeid × venue combination."""
+    targets = []
     venues_to_check = venue_ids if venue_ids else [''] # Use [''] to fetch without venue filter if none provided
 
     for category in categories_to_process:
@@ -151,42 +606,171 @@ def fetch_and_group_events(categories_to_process, city, venue_ids, tiyatro_filmt
 
         for type_id in filmtypeids_for_category:
             for venue_id in venues_to_check:
-                target_url = build_url(category, city, date_filter, type_id, venue_id)
-                html = fetch_html(target_url)
-                if html:
-                    events = extract_events(html, category)
-                    all_events.extend(events)
+                targets.append((category, build_url(category, city, date_filter, type_id, venue_id)))
+    return targets
+
+def plan_discovered_targets(categories_to_process, city, venue_ids, tiyatro_filmtypeids, opera_filmtypeids, date_filter='',
+                            client=None, venue_filters=None, prefetched=None):
+    """
+    Like plan_fetch_targets, but reads the city page's filter markup first and requests each
+    film type once without a venue filter; requested venues are then kept by name
+    (venue_filters[url] = {casefolded venue label: (category, that venue's ID url)}) instead of
+    one request per type × venue. Categories whose requested venue IDs cannot all be named fall
+    back to plan_fetch_targets. The city page itself is stored in `prefetched` (url -> HTML) when
+    it is also a target, so it is not downloaded twice.
+    """
+    client = client or default_client
+    targets = []
+    for category in categories_to_process:
+        discovery_url = build_url(category, city, date_filter)
+        html = fetch_html(discovery_url, client)
+        filters = discover_filters(html or '')
+        if category == 'tiyatro':
+            type_ids = tiyatro_filmtypeids
+        elif category == 'opera-bale':
+            type_ids = opera_filmtypeids
+        else:
+            type_ids = []
+
+        unknown_types = [type_id for type_id in type_ids if filters['filmtypes'] and str(type_id) not in filters['filmtypes']]
+        if unknown_types:
+            print(f"Warning: filmtypeid(s) {', '.join(map(str, unknown_types))} not offered for {category} in {city}")
+
+        venue_names = {venue_id: filters['venues'].get(str(venue_id)) for venue_id in venue_ids}
+        if None in venue_names.values():
+            targets.extend(plan_fetch_targets([category], city, venue_ids, tiyatro_filmtypeids, opera_filmtypeids, date_filter))
+            continue
+        for type_id in type_ids or [0]:
+            url = build_url(category, city, date_filter, type_id)
+            targets.append((category, url))
+            if html and url == discovery_url and prefetched is not None:
+                prefetched[url] = html
+            if venue_names and venue_filters is not None:
+                venue_filters[url] = {name.casefold(): (category, build_url(category, city, date_filter, type_id, venue_id))
+                                      for venue_id, name in venue_names.items()}
+    return targets
+
+def plan_sweep(categories_to_process, cities, venue_ids, tiyatro_filmtypeids, opera_filmtypeids, date_filter='',
+               discovery_client=None, venue_filters=None, prefetched=None):
+    """
+    Plans the whole URL frontier for several cities up front: drops URLs that normalize to
+    one already planned and interleaves the cities round-robin, so a shared politeness
+    budget is spent fairly instead of finishing one city before starting the next.
+    With a `discovery_client` each city is planned with plan_discovered_targets.
+    """
+    seen_urls = set()
+    targets_by_city = []
+    for city in cities:
+        city_targets = []
+        if discovery_client:
+            planned = plan_discovered_targets(categories_to_process, city, venue_ids, tiyatro_filmtypeids, opera_filmtypeids,
+                                              date_filter, discovery_client, venue_filters, prefetched)
+        else:
+            planned = plan_fetch_targets(categories_to_process, city, venue_ids, tiyatro_filmtypeids, opera_filmtypeids, date_filter)
+        for category, url in planned:
+            key = normalize_url(url)
+            if key not in seen_urls:
+                seen_urls.add(key)
+                city_targets.append((category, url))
+        targets_by_city.append(city_targets)
+    return [target for round_targets in zip_longest(*targets_by_city) for target in round_targets if target]
+
+def fetch_and_group_events(categories_to_process, city, venue_ids, tiyatro_filmtypeids, opera_filmtypeids, date_filter='',
+                           client=None, parser_backend='auto', parse_workers=DEFAULT_PARSE_WORKERS, page_state=None,
+                           discover=False, max_pages=DEFAULT_MAX_PAGES, watched=None, listing_sources=None):
+    """
+    Fetches events for specified categories, venues, and film types,
+    aggregates the results, and structures them by date, leaving out the plays in
+    `watched` (a biletinial_identity.PlayMatcher, watched_plays if omitted).
+    `city` is a city slug or a list of slugs swept together (see plan_sweep).
+    Pages are fetched concurrently through `client` (an HttpClient, default_client if omitted)
+    and parsed with `parser_backend` in `parse_workers` processes; see fetch_and_parse_pages
+    for `page_state` and `max_pages`. With `discover` the request set is planned from the
+    site's own filters (see plan_discovered_targets).
+
+    Every event carries its 'source', the listing URL it came from; a venue kept by name from a
+    discovered listing gets the URL that requests that venue by ID, so the source is the same
+    with and without `discover`. `listing_sources` (a dict) receives source -> True if that
+    listing was downloaded completely, False if any of its pages failed.
+    """
+    client = client or default_client
+    watched = watched_plays if watched is None else watched
+    cities = [city] if isinstance(city, str) else city
+    venue_filters = {}
+    prefetched = {}
+    failed_urls = set()
+    with client.metrics.stage('plan_targets'):
+        targets = plan_sweep(categories_to_process, cities, venue_ids, tiyatro_filmtypeids, opera_filmtypeids, date_filter,
+                             discovery_client=client if discover else None, venue_filters=venue_filters, prefetched=prefetched)
+
+    # 'crawl' is the wall-clock time of the whole fetch/parse pipeline; 'fetch' and 'parse' sum per page
+    with client.metrics.stage('crawl'):
+        page_events = fetch_and_parse_pages(targets, client, parser_backend, parse_workers, page_state, max_pages, prefetched,
+                                            failed_urls)
+        # A requested venue matching none of a listing's events most likely means its filter label
+        # differs from the venue name in the listing; that venue is requested by ID instead
+        fallback_targets = []
+        for (category, url), events in zip(targets, page_events):
+            venue_filter = venue_filters.get(url)
+            if not venue_filter or not events:
+                continue
+            listed_venues = {event['venue'].casefold() for event in events}
+            for name in [name for name in venue_filter if name not in listed_venues]:
+                fallback_target = venue_filter.pop(name)
+                print(f"Warning: no event in {url} matched the venue filter label '{name}'; "
+                      f"requesting {fallback_target[1]} instead")
+                fallback_targets.append(fallback_target)
+        if fallback_targets:
+            targets = targets + fallback_targets
+            page_events += fetch_and_parse_pages(fallback_targets, client, parser_backend, parse_workers, page_state, max_pages,
+                                                 failed_urls=failed_urls)
+    if listing_sources is not None:
+        for category, url in targets:
+            for _, source in venue_filters[url].values() if url in venue_filters else [(category, url)]:
+                listing_sources[source] = url not in failed_urls
+
+    def event_source(url, event):
+        return venue_filters[url][event['venue'].casefold()][1] if url in venue_filters else url
+
+    with client.metrics.stage('group'):
+        grouped = group_events(dict(event, source=event_source(url, event))
+                               for (category, url), events in zip(targets, page_events)
+                               for event in events
+                               if (url not in venue_filters or event['venue'].casefold() in venue_filters[url])
+                               and not (watched and watched.matches(event['play'], event['link_relative'])))
+    client.count('showings', sum(len(events) for events in grouped.values()))
+    return grouped
+
+def group_events(events):
+    """
+    Groups parsed event dicts by date: {'Month - DD': [events shown that day]}, with an
+    empty list for every day between the first and last showing.
+    """
+    # Parsed events go into one interned table; overlapping filters (or cities sharing a venue)
+    # can list the same showing more than once, the table keeps the first of each key
+    table = biletinial_events.EventTable(EVENT_FIELDS, key_fields=EVENT_KEY_FIELDS)
+    for event in events:
+        table.append(event)
+    table.drop_key_index()
 
     # --- Grouping and Date Range Logic ---
     events_by_date = defaultdict(list)
     all_parsed_dates = set()
 
-    for event in all_events:
-        date_string = event['date']
-        dates_str_list = extract_dates_from_string(date_string)
-        for date_str in dates_str_list:
-            parsed_date = parse_turkish_date(date_str)
-            if parsed_date:
-                all_parsed_dates.add(parsed_date)
-                # Append the whole event dict
-                events_by_date[date_str].append(event)
+    # Each raw date string is parsed once (memoized) into ('Month - DD', day ordinal) pairs
+    reference = biletinial_dates.reference_day()
+    for event, raw_date in zip(table.rows(), table.column('date')):
+        for date_str, ordinal in biletinial_dates.parse_raw_dates(raw_date, reference):
+            all_parsed_dates.add(ordinal)
+            # The same Event view is shared by every date it is shown on
+            events_by_date[date_str].append(event)
 
     if not all_parsed_dates:
         return dict(events_by_date)
 
-    start_date = min(all_parsed_dates)
-    end_date = max(all_parsed_dates)
-
-    current_date = start_date
-    while current_date <= end_date:
-        month_num_str = current_date.strftime("%m")
-        month_name = [name for name, num in TURKISH_MONTHS.items() if num == month_num_str][0]
-        day_str = current_date.strftime("%d")
-        date_key = f"{month_name} - {day_str}"
-
-        if date_key not in events_by_date:
-            events_by_date[date_key] = [] # Ensure empty dates exist
-        current_date += timedelta(days=1)
+    # Ensure empty dates exist between the first and last showing
+    for ordinal in range(min(all_parsed_dates), max(all_parsed_dates) + 1):
+        events_by_date.setdefault(biletinial_dates.date_key(ordinal), [])
 
     return dict(events_by_date)
 
@@ -194,100 +778,336 @@ def extract_dates_from_string(date_string):
     """
     Extracts individual date strings (Month - DD) from the raw date string.
     """
-    parts = date_string.split(" - ")
-    month = parts[0]
-    dates = []
-    if month not in TURKISH_MONTHS:
-        return dates
-
-    for part in parts[1:]:
-        day_part = part.split(" ")[0]
-        if day_part.isdigit():
-             dates.append(f"{month} - {day_part.zfill(2)}")
-    return dates
+    return [date_str for date_str, _ in biletinial_dates.parse_raw_dates(date_string)]
 
 def parse_turkish_date(date_str):
     """
-    Parses a Turkish date string "Month - DD" into a datetime object.
-    Returns None if parsing fails.
+    Parses a Turkish date string "Month - DD" into a datetime object, in the next year
+    for months already past (see biletinial_dates). Returns None if parsing fails.
     """
+    ordinal = biletinial_dates.parse_date_key(date_str)
+    return biletinial_dates.to_datetime(ordinal) if ordinal else None
+
+def load_state(state_filename):
+    """Reads the incremental-mode state of the previous run, or an empty state."""
     try:
-        parts = date_str.split(" - ")
-        month_name = parts[0]
-        day = int(parts[1])
-        month_num = TURKISH_MONTHS.get(month_name)
-        if not month_num:
-            return None
-        current_year = datetime.now().year
-        return datetime(current_year, int(month_num), day)
-    except (ValueError, IndexError):
-        return None
+        with open(state_filename, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'pages': {}, 'showings': {}}
+
+def save_state(state_filename, state):
+    with open(state_filename, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+
+def index_showings(grouped_events):
+    """Maps 'link|YYYY-MM-DD' -> showing dict, the identity used for delta detection."""
+    showings = {}
+    for parsed_date, showing in iter_showings(grouped_events):
+        showing = dict(showing, date=parsed_date.strftime('%Y-%m-%d'))
+        # Which listing reported a showing is not a change to the showing
+        del showing['source']
+        showings[f"{showing['link']}|{showing['date']}"] = showing
+    return showings
+
+def compute_delta(previous_showings, current_showings):
+    """Returns added, removed and changed (same play and date, different venue/name/category) showings."""
+    added = [current_showings[key] for key in sorted(current_showings.keys() - previous_showings.keys())]
+    removed = [previous_showings[key] for key in sorted(previous_showings.keys() - current_showings.keys())]
+    changed = [{'before': previous_showings[key], 'after': current_showings[key]}
+               for key in sorted(current_showings.keys() & previous_showings.keys())
+               if previous_showings[key] != current_showings[key]]
+    return {'added': added, 'removed': removed, 'changed': changed}
+
+def parse_price(price_text):
+    """'1.250,50' / '350' -> float, using Turkish thousands/decimal separators."""
+    if ',' in price_text:
+        price_text = price_text.replace('.', '').replace(',', '.')
+    elif re.fullmatch(r'\d{1,3}(\.\d{3})+', price_text):
+        price_text = price_text.replace('.', '')
+    return float(price_text)
+
+def parse_event_details(html_content):
+    """
+    Extracts enrichment data from an event detail page's text:
+    {'sessions': {'Nisan - 18': {'times': ['20:30'], 'sold_out': False}}, 'prices': [...], 'duration': minutes or None}.
+    """
+    text = DETAIL_SCRIPT_RE.sub(' ', html_content)
+    text = ' '.join(unescape(TAG_RE.sub(' ', text)).split())
+
+    sessions = {}
+    date_matches = list(DETAIL_SESSION_DATE_RE.finditer(text))
+    for position, match in enumerate(date_matches):
+        window_end = match.end() + DETAIL_SESSION_WINDOW
+        if position + 1 < len(date_matches):
+            window_end = min(window_end, date_matches[position + 1].start())
+        window = text[match.end():window_end]
+        date_key = f"{match.group(2)} - {match.group(1).zfill(2)}"
+        session = sessions.setdefault(date_key, {'times': [], 'sold_out': False})
+        for hour, minute in DETAIL_SHOWTIME_RE.findall(window):
+            showtime = f"{int(hour):02d}:{minute}"
+            if showtime not in session['times']:
+                session['times'].append(showtime)
+        session['sold_out'] = session['sold_out'] or bool(DETAIL_SOLD_OUT_RE.search(window))
+
+    duration = DETAIL_DURATION_RE.search(text)
+    return {
+        'sessions': sessions,
+        'prices': sorted({parse_price(price) for price in DETAIL_PRICE_RE.findall(text)}),
+        'duration': int(duration.group(1)) if duration else None
+    }
+
+def enrich_events(grouped_events, client=None, cache_filename=None, ttl=DEFAULT_CACHE_TTL):
+    """
+    Fetches every unique detail page (urljoin(BASE_DOMAIN, link_relative)) once, concurrently
+    through `client`, and returns grouped_events with per-date copies of each event carrying
+    'showtimes', 'sold_out', 'prices' and 'duration'. Parsed details are kept in `cache_filename`
+    (JSON) and reused for `ttl` seconds.
+    """
+    client = client or default_client
+    cached = {}
+    if cache_filename:
+        try:
+            with open(cache_filename, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except FileNotFoundError:
+            pass
+
+    now = time.time()
+    links = sorted({event['link_relative'] for events in grouped_events.values() for event in events})
+    to_fetch = [link for link in links if link not in cached or now - cached[link]['fetched_at'] >= ttl]
+    with ThreadPoolExecutor(max_workers=client.concurrency) as fetch_pool:
+        pages = fetch_pool.map(lambda link: fetch_html(urljoin(BASE_DOMAIN, link), client), to_fetch)
+        for link, html in zip(to_fetch, pages):
+            if html:
+                with client.metrics.stage('detail_parse'):
+                    cached[link] = {'fetched_at': now, 'details': parse_event_details(html)}
+    client.count('detail_pages', len(to_fetch))
+    client.count('details_cached', len(links) - len(to_fetch))
+
+    if cache_filename:
+        with open(cache_filename, 'w', encoding='utf-8') as f:
+            json.dump(cached, f, ensure_ascii=False)
+
+    enriched = {}
+    for date_key, events in grouped_events.items():
+        enriched[date_key] = []
+        for event in events:
+            details = cached.get(event['link_relative'], {}).get('details')
+            if not details:
+                enriched[date_key].append(event)
+                continue
+            session = details['sessions'].get(date_key, {'times': [], 'sold_out': False})
+            enriched[date_key].append(dict(event, showtimes=session['times'], sold_out=session['sold_out'],
+                                           prices=details['prices'], duration=details['duration']))
+    return enriched
+
+def format_event_extras(event):
+    """' | 20:30 | 150-300 TL | Tükendi' for enriched events, '' otherwise."""
+    extras = []
+    if event.get('showtimes'):
+        extras.append(', '.join(event['showtimes']))
+    if event.get('prices'):
+        low, high = event['prices'][0], event['prices'][-1]
+        extras.append(f"{low:g} TL" if low == high else f"{low:g}-{high:g} TL")
+    if event.get('sold_out'):
+        extras.append("Tükendi")
+    return ''.join(f" | {extra}" for extra in extras)
+
+def iter_sorted_showings(grouped_events):
+    """
+    Yields (date_key, day ordinal, events) for every date that has events, in date order,
+    with each date's events sorted by category and play (grouped_events is left as is).
+    A play listed twice for the same venue and date (e.g. under two date ranges) is yielded once.
+    """
+    dated = [(biletinial_dates.parse_date_key(date_key) or 0, date_key) for date_key in grouped_events]
+    for ordinal, date_key in sorted(dated):
+        unique_events = {}
+        for event in grouped_events[date_key]:
+            unique_events.setdefault((event['link_relative'], event['venue']), event)
+        if unique_events:
+            yield date_key, ordinal, sorted(unique_events.values(), key=lambda x: (x['category'], x['play']))
+
+def output_record(ordinal, event):
+    """Flat record of one showing for the jsonl/csv/ics writers (see biletinial_writers.SHOWING_FIELDS)."""
+    prices = event.get('prices') or [None]
+    return {
+        'date': biletinial_dates.to_datetime(ordinal).date().isoformat() if ordinal else None,
+        'play': event['play'],
+        'venue': event['venue'],
+        'category': event['category'],
+        'link': urljoin(BASE_DOMAIN, event['link_relative']),
+        'showtimes': list(event.get('showtimes') or ()),
+        'price_min': prices[0],
+        'price_max': prices[-1],
+        'sold_out': event.get('sold_out')
+    }
+
+def iter_showings(grouped_events):
+    """
+    Yields (date, event) pairs for the event store, one per play, venue and date it is shown on
+    (a play listed twice for the same venue and date, e.g. under two date ranges, is yielded once).
+    """
+    for date_key, events in grouped_events.items():
+        parsed_date = parse_turkish_date(date_key)
+        if not parsed_date:
+            continue
+        seen = set()
+        for event in events:
+            key = (event['link_relative'], event['venue'])
+            if key in seen:
+                continue
+            seen.add(key)
+            yield parsed_date, {
+                'play': event['play'],
+                'venue': event['venue'],
+                'category': event['category'],
+                'link': urljoin(BASE_DOMAIN, event['link_relative']),
+                'source': event.get('source'),
+                'showtimes': event.get('showtimes'),
+                'prices': event.get('prices'),
+                'sold_out': event.get('sold_out')
+            }
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Scrape events from biletinial.com.")
-    parser.add_argument("--category", required=True, choices=['tiyatro', 'opera-bale', 'both'], help="Event category ('tiyatro', 'opera-bale', or 'both')")
-    parser.add_argument("--city", required=True, help="City slug (e.g., 'antalya')")
+    parser.add_argument("--category", required=True, nargs='+', help="Event category slugs (e.g. 'tiyatro', 'opera-bale', 'konser', 'stand-up'); 'both' means tiyatro and opera-bale")
+    parser.add_argument("--city", required=True, nargs='+', help="City slugs (e.g., 'antalya'); several cities are swept in one run")
     parser.add_argument("--date", default="", help="Date filter (e.g., 'YYYY-MM-DD', 'thisweekend', or empty for all)")
     parser.add_argument("--tiyatro-filmtypeids", nargs='+', default=[], help="List of Theatre Film Type IDs (optional)")
     parser.add_argument("--opera-filmtypeids", nargs='+', default=[], help="List of Opera/Ballet Film Type IDs (optional)")
     parser.add_argument("--venue-id", nargs='+', default=[], help="List of Venue IDs (optional, fetches all if omitted)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help=f"Maximum simultaneous requests (default {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help=f"Maximum requests per second per host, 0 for unlimited (default {DEFAULT_RATE})")
+    parser.add_argument("--cache-dir", default=None, help="Directory for the on-disk response cache (disabled if omitted)")
+    parser.add_argument("--cache-ttl", type=int, default=DEFAULT_CACHE_TTL, help=f"Seconds a cached page is used without revalidation (default {DEFAULT_CACHE_TTL})")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024), help="Cache size limit in MB, least recently used pages are evicted first")
+    parser.add_argument("--parser", default="auto", choices=PARSER_BACKENDS, help="HTML parser backend (default: fastest installed)")
+    parser.add_argument("--parse-workers", type=int, default=DEFAULT_PARSE_WORKERS, help=f"Processes parsing pages while fetching continues, 0 parses in the fetch threads (default {DEFAULT_PARSE_WORKERS})")
+    parser.add_argument("--offline", action="store_true", help="Serve pages only from --cache-dir, never touch the network")
+    parser.add_argument("--discover", action="store_true", help="Read venues and film types from the site's filters and request each film type once, filtering venues locally")
+    parser.add_argument("--list-filters", action="store_true", help="Print the venue and film type IDs offered for each city/category and exit")
+    parser.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES, help=f"Listing pages followed per URL (default {DEFAULT_MAX_PAGES})")
+    parser.add_argument("--enrich", action="store_true", help="Fetch each unique event detail page once and add showtimes, prices and sold-out status")
+    parser.add_argument("--enrich-cache", default="biletinial_details_cache.json", help="JSON cache of parsed detail pages, reused for --cache-ttl seconds")
+    parser.add_argument("--watched-file", default=DEFAULT_WATCHED_FILE, help="Plays to leave out, one name or biletinial link per line, matched ignoring case, Turkish letters and company suffixes (default watched_plays.txt next to the script, '' for none)")
+    parser.add_argument("--format", choices=biletinial_writers.OUTPUT_FORMATS, default='text', help="Output format: the grouped text listing, or one record per showing as JSON Lines, CSV or iCalendar")
+    parser.add_argument("--output", default=None, help="Output file (default biletinial_scraper_output.<txt|jsonl|csv|ics>)")
+    parser.add_argument("--db", default=None, help="SQLite event store to upsert the scraped showings into (optional)")
+    parser.add_argument("--incremental", action="store_true", help="Skip re-parsing unchanged pages and write the showings added/removed/changed since the last run to --delta-file; exits with 1 if anything changed")
+    parser.add_argument("--state-file", default="biletinial_scraper_state.json", help="Page fingerprints and showings of the last incremental run")
+    parser.add_argument("--delta-file", default="biletinial_scraper_delta.json", help="Where --incremental writes the changes")
+    parser.add_argument("--metrics-file", default=None, help="Export per-stage timings and counters: *.json (snapshot), *.jsonl (one line appended per run) or a Prometheus textfile (e.g. *.prom)")
+    parser.add_argument("--profile", nargs='?', const="biletinial_scraper.prof", default=None, help="Profile the run with cProfile, print the top functions and save the stats (default biletinial_scraper.prof); use --parse-workers 0 to include parsing")
 
     args = parser.parse_args()
+    if args.offline and not args.cache_dir:
+        parser.error("--offline requires --cache-dir")
+    if args.watched_file and not os.path.exists(args.watched_file):
+        parser.error(f"--watched-file {args.watched_file} does not exist")
+    if args.profile:
+        biletinial_metrics.start_profiling(args.profile)
 
     categories_to_process = []
-    if args.category == 'both':
-        categories_to_process = ['tiyatro', 'opera-bale']
-    else:
-        categories_to_process = [args.category]
+    for category in args.category:
+        for slug in (['tiyatro', 'opera-bale'] if category == 'both' else [category]):
+            if slug not in categories_to_process:
+                categories_to_process.append(slug)
+
+    cache = ResponseCache(args.cache_dir, ttl=args.cache_ttl, max_bytes=args.cache_max_mb * 1024 * 1024) if args.cache_dir else None
+    client = HttpClient(concurrency=args.concurrency, rate=args.rate, cache=cache, offline=args.offline)
+    state = load_state(args.state_file) if args.incremental else None
+    listing_sources = {}
 
+    if args.list_filters:
+        for city in args.city:
+            for category in categories_to_process:
+                filters = discover_filters(fetch_html(build_url(category, city, args.date), client) or '')
+                print(f"\n{city} / {category}:")
+                for kind, label in (('venues', 'Venue IDs (--venue-id)'), ('filmtypes', 'Film type IDs')):
+                    print(f"  {label}:")
+                    for filter_id, name in sorted(filters[kind].items(), key=lambda item: item[1]):
+                        print(f"    {filter_id:>8}  {name}")
+        client.close()
+        sys.exit(0)
     grouped_events = fetch_and_group_events(
         categories_to_process,
         args.city,
         args.venue_id,
         args.tiyatro_filmtypeids,
         args.opera_filmtypeids,
-        args.date
+        args.date,
+        client=client,
+        parser_backend=args.parser,
+        parse_workers=args.parse_workers,
+        page_state=state['pages'] if state else None,
+        discover=args.discover,
+        max_pages=args.max_pages,
+        watched=biletinial_identity.load_watched(args.watched_file),
+        listing_sources=listing_sources
     )
+    metrics = client.metrics
+    if args.enrich:
+        with metrics.stage('enrich'):
+            grouped_events = enrich_events(grouped_events, client, args.enrich_cache, args.cache_ttl)
+    print(f"Fetch summary: {client.summary()}")
+    client.close()
 
-    # Write output to file instead of console
-    output_filename = "biletinial_scraper_output.txt"
-    with open(output_filename, 'w', encoding='utf-8') as output_file:
-        output_file.write("--- Grouped Events by Date ---\n") # Removed leading newline for cleaner file start
-
-        if grouped_events:
-            def sort_key(date_str):
-                parsed = parse_turkish_date(date_str)
-                return parsed if parsed else datetime.min
-
-            try:
-                sorted_dates = sorted(grouped_events.keys(), key=sort_key)
-                for date in sorted_dates:
-                    events = grouped_events[date]
-                    # Only write the date header if there are events for that date
-                    if events:
-                        output_file.write(f"\n{date}:\n")
-                        events.sort(key=lambda x: (x['category'], x['play']))
-                        for event in events:
-                            # Construct full URL
-                            full_url = urljoin(BASE_DOMAIN, event['link_relative'])
-                            # Write event details with link
-                            output_file.write(f"  - [{event['category'].upper()}] {event['play']} – {event['venue']} -> {full_url}\n")
-                    # Removed the 'else' block that printed "No events scheduled."
-            except Exception as e:
-                # Write error message to the file as well
-                output_file.write(f"\nError during output generation: {e}. Printing unsorted.\n")
-                # Fallback to unsorted printing (without "No events scheduled")
-                for date, events in grouped_events.items():
-                     if events: # Only write if there are events
-                        output_file.write(f"\n{date}:\n")
-                        events.sort(key=lambda x: (x['category'], x['play']))
-                        for event in events:
-                            full_url = urljoin(BASE_DOMAIN, event['link_relative'])
-                            output_file.write(f"  - [{event['category'].upper()}] {event['play']} – {event['venue']} -> {full_url}\n")
+    if args.db:
+        with metrics.stage('store'):
+            conn = biletinial_store.connect(args.db)
+            # Showings missing from this run are only dropped from listings fetched in full
+            complete_sources = [source for source, complete in listing_sources.items() if complete]
+            failed_listings = len(listing_sources) - len(complete_sources)
+            written, deleted = biletinial_store.save_showings(conn, iter_showings(grouped_events),
+                                                              prune_sources=complete_sources)
+            conn.close()
+        print(f"{written} showings written to {args.db}, {deleted} no longer listed removed"
+              + (f" ({failed_listings} listings not pruned: fetch failed)" if failed_listings else ""))
+
+    delta = None
+    if args.incremental:
+        current_showings = index_showings(grouped_events)
+        delta = compute_delta(state['showings'], current_showings)
+        state['showings'] = current_showings
+        save_state(args.state_file, state)
+        with open(args.delta_file, 'w', encoding='utf-8') as delta_file:
+            json.dump(delta, delta_file, ensure_ascii=False, indent=2)
+        print(f"Delta written to {args.delta_file}: {len(delta['added'])} added, "
+              f"{len(delta['removed'])} removed, {len(delta['changed'])} changed")
+
+    # Write output to file instead of console, one showing at a time
+    output_filename = args.output or biletinial_writers.output_filename("biletinial_scraper_output", args.format)
+    with metrics.stage('write'), biletinial_writers.open_output(output_filename, args.format) as output_file:
+        if args.format != 'text':
+            records = (output_record(ordinal, event)
+                       for _, ordinal, events in iter_sorted_showings(grouped_events) for event in events)
+            metrics.count('showings_written', biletinial_writers.write_records(output_file, args.format, records))
         else:
-             output_file.write("\nNo events found or could be grouped for the specified criteria.\n") # Added leading newline
-        output_file.write("------------------------------\n")
+            output_file.write("--- Grouped Events by Date ---\n") # Removed leading newline for cleaner file start
 
-        output_file.write("\nScript finished.\n")
+            if grouped_events:
+                # Only dates with events get a header
+                for date, _, events in iter_sorted_showings(grouped_events):
+                    output_file.write(f"\n{date}:\n")
+                    for event in events:
+                        # Construct full URL
+                        full_url = urljoin(BASE_DOMAIN, event['link_relative'])
+                        # Write event details with link
+                        output_file.write(f"  - [{event['category'].upper()}] {event['play']} – {event['venue']} -> {full_url}{format_event_extras(event)}\n")
+                    metrics.count('showings_written', len(events))
+            else:
+                 output_file.write("\nNo events found or could be grouped for the specified criteria.\n") # Added leading newline
+            output_file.write("------------------------------\n")
+
+            output_file.write("\nScript finished.\n")
     # Print a confirmation to the console that the file has been written
-    print(f"Output successfully written to {output_filename}")
\ No newline at end of file
+    print(f"Output successfully written to {output_filename}")
+    print(f"Stage timings: {metrics.summary()}")
+    if args.metrics_file:
+        biletinial_metrics.write_metrics(args.metrics_file, metrics, 'biletinial_scraper')
+        print(f"Metrics written to {args.metrics_file}")
+
+    # Incremental mode follows diff's convention: 0 = no changes, 1 = changes
+    if delta and any(delta.values()):
+        sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,165 @@
+import sqlite3
+from datetime import date, datetime
+
+# SQLite event store shared by biletinial_scraper.py (writer) and etkinlik_planlayici.py (reader).
+# Plays are keyed by their biletinial link, showings by (play, date); dates are ISO 'YYYY-MM-DD'.
+# Every showing records the listing URL it was last seen on (its source); a run replaces the
+# showings of the listings it fetched in full within the dates it saw there, so cancelled or
+# removed showings do not linger while other cities, categories and venues are left alone.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS venues (
+    id   INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS plays (
+    id       INTEGER PRIMARY KEY,
+    link     TEXT NOT NULL UNIQUE,
+    name     TEXT NOT NULL,
+    category TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS showings (
+    id         INTEGER PRIMARY KEY,
+    play_id    INTEGER NOT NULL REFERENCES plays(id),
+    venue_id   INTEGER NOT NULL REFERENCES venues(id),
+    date       TEXT NOT NULL,
+    scraped_at TEXT NOT NULL,
+    showtimes  TEXT,
+    price_min  REAL,
+    price_max  REAL,
+    sold_out   INTEGER,
+    source     TEXT,
+    UNIQUE (play_id, date)
+);
+CREATE INDEX IF NOT EXISTS idx_showings_date ON showings(date);
+CREATE INDEX IF NOT EXISTS idx_showings_play ON showings(play_id);
+"""
+
+# Columns added after the first schema (detail-page fields, source listing); older stores get
+# them via ALTER TABLE. Showings stored before 'source' existed have none and are never pruned.
+SHOWING_DETAIL_COLUMNS = (
+    ('showtimes', 'TEXT'),
+    ('price_min', 'REAL'),
+    ('price_max', 'REAL'),
+    ('sold_out', 'INTEGER'),
+    ('source', 'TEXT'),
+)
+
+
+def connect(db_path):
+    """Opens (and if needed creates) the event store in WAL mode."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(SCHEMA)
+    migrate(conn)
+    return conn
+
+
+def migrate(conn):
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(showings)")}
+    with conn:
+        for column, column_type in SHOWING_DETAIL_COLUMNS:
+            if column not in existing:
+                conn.execute(f"ALTER TABLE showings ADD COLUMN {column} {column_type}")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_showings_source ON showings(source, date)")
+
+
+def to_iso(day):
+    if isinstance(day, datetime):
+        day = day.date()
+    return day.isoformat()
+
+
+def save_showings(conn, showings, prune_sources=None):
+    """
+    Upserts showings into the store. `showings` yields (date, event) pairs where event
+    has 'play', 'venue', 'category' and 'link' (absolute URL), plus optional 'source'
+    (listing URL) and detail-page 'showtimes', 'prices' and 'sold_out'. With `prune_sources`
+    (listing URLs fetched in full), stored showings from those listings dated between the
+    first and last date written for the listing but missing from `showings` are deleted in
+    the same transaction. Returns (showings stored, number deleted); a (play, date) written
+    more than once counts once.
+    """
+    scraped_at = datetime.now().isoformat(timespec='seconds')
+    venue_ids = {}
+    play_ids = {}
+    kept = set()          # (play_id, ISO date) of every showing written
+    source_days = {}      # source -> [first, last] ISO date written for it
+
+    with conn:
+        for day, event in showings:
+            venue_id = venue_ids.get(event['venue'])
+            if venue_id is None:
+                conn.execute("INSERT INTO venues(name) VALUES (?) ON CONFLICT(name) DO NOTHING", (event['venue'],))
+                venue_id = conn.execute("SELECT id FROM venues WHERE name = ?", (event['venue'],)).fetchone()[0]
+                venue_ids[event['venue']] = venue_id
+
+            play_id = play_ids.get(event['link'])
+            if play_id is None:
+                conn.execute(
+                    "INSERT INTO plays(link, name, category) VALUES (?, ?, ?) "
+                    "ON CONFLICT(link) DO UPDATE SET name = excluded.name, category = excluded.category",
+                    (event['link'], event['play'], event['category']))
+                play_id = conn.execute("SELECT id FROM plays WHERE link = ?", (event['link'],)).fetchone()[0]
+                play_ids[event['link']] = play_id
+
+            showtimes = ','.join(event['showtimes']) if event.get('showtimes') else None
+            prices = event.get('prices') or [None]
+            sold_out = None if event.get('sold_out') is None else int(event['sold_out'])
+            iso_day = to_iso(day)
+            source = event.get('source')
+            conn.execute(
+                "INSERT INTO showings(play_id, venue_id, date, scraped_at, showtimes, price_min, price_max, sold_out, source) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(play_id, date) DO UPDATE SET venue_id = excluded.venue_id, scraped_at = excluded.scraped_at, "
+                "showtimes = COALESCE(excluded.showtimes, showtimes), price_min = COALESCE(excluded.price_min, price_min), "
+                "price_max = COALESCE(excluded.price_max, price_max), sold_out = COALESCE(excluded.sold_out, sold_out), "
+                "source = COALESCE(excluded.source, source)",
+                (play_id, venue_id, iso_day, scraped_at, showtimes, prices[0], prices[-1], sold_out, source))
+            kept.add((play_id, iso_day))
+            if source:
+                window = source_days.setdefault(source, [iso_day, iso_day])
+                window[0] = min(window[0], iso_day)
+                window[1] = max(window[1], iso_day)
+
+        deleted = 0
+        for source in prune_sources or ():
+            if source not in source_days:
+                continue
+            first_day, last_day = source_days[source]
+            stale = [(showing_id,) for showing_id, play_id, day in conn.execute(
+                         "SELECT id, play_id, date FROM showings WHERE source = ? AND date BETWEEN ? AND ?",
+                         (source, first_day, last_day))
+                     if (play_id, day) not in kept]
+            conn.executemany("DELETE FROM showings WHERE id = ?", stale)
+            deleted += len(stale)
+    return len(kept), deleted
+
+
+def query_showings(conn, start_date=None, end_date=None):
+    """
+    Returns showings in [start_date, end_date] (either bound optional) as
+    (date, play, venue, category, link, showtimes, price_min, price_max, sold_out) tuples
+    ordered by date, category and play. Detail columns are None when never enriched.
+    """
+    query = ("SELECT s.date, p.name, v.name, p.category, p.link, "
+             "s.showtimes, s.price_min, s.price_max, s.sold_out FROM showings s "
+             "JOIN plays p ON p.id = s.play_id JOIN venues v ON v.id = s.venue_id")
+    conditions = []
+    params = []
+    if start_date:
+        conditions.append("s.date >= ?")
+        params.append(to_iso(start_date))
+    if end_date:
+        conditions.append("s.date <= ?")
+        params.append(to_iso(end_date))
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY s.date, p.category, p.name"
+
+    return [(date.fromisoformat(day), play, venue, category, link,
+             showtimes.split(',') if showtimes else [], price_min, price_max,
+             None if sold_out is None else bool(sold_out))
+            for day, play, venue, category, link, showtimes, price_min, price_max, sold_out in conn.execute(query, params)]
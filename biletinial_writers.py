@@ -0,0 +1,129 @@
+import csv
+import hashlib
+import json
+from datetime import date, datetime, timezone
+
+# Streaming record writers shared by biletinial_scraper.py and etkinlik_planlayici.py.
+# Records are flat dicts with an ISO 'date' ('YYYY-MM-DD'); each one is written as soon as
+# it is produced, so the caller can feed a generator and never hold the whole result.
+
+OUTPUT_FORMATS = ('text', 'jsonl', 'csv', 'ics')
+FORMAT_EXTENSIONS = {'text': 'txt', 'jsonl': 'jsonl', 'csv': 'csv', 'ics': 'ics'}
+
+SHOWING_FIELDS = ('date', 'play', 'venue', 'category', 'link', 'showtimes', 'price_min', 'price_max', 'sold_out')
+
+ICS_PRODID = '-//biletinial-etkinlik-planlayici//TR'
+ICS_DEFAULT_DURATION = 'PT2H'   # assumed length of a timed showing
+ICS_LINE_LIMIT = 75             # octets per content line before folding (RFC 5545)
+
+
+def output_filename(prefix, output_format):
+    return f"{prefix}.{FORMAT_EXTENSIONS[output_format]}"
+
+
+def write_jsonl(output_file, records, fields):
+    count = 0
+    for record in records:
+        output_file.write(json.dumps({field: record.get(field) for field in fields}, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def write_csv(output_file, records, fields):
+    writer = csv.writer(output_file)
+    writer.writerow(fields)
+    count = 0
+    for record in records:
+        writer.writerow([csv_value(record.get(field)) for field in fields])
+        count += 1
+    return count
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return ' '.join(str(item) for item in value)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def ics_escape(text):
+    return (str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def ics_fold(line):
+    """Splits a content line into <= 75-octet pieces, continuation lines start with a space."""
+    data = line.encode('utf-8')
+    if len(data) <= ICS_LINE_LIMIT:
+        return line + "\r\n"
+    pieces = []
+    limit = ICS_LINE_LIMIT
+    while data:
+        cut = min(limit, len(data))
+        # Never split a multi-byte UTF-8 sequence
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        pieces.append(data[:cut].decode('utf-8'))
+        data = data[cut:]
+        limit = ICS_LINE_LIMIT - 1
+    return "\r\n ".join(pieces) + "\r\n"
+
+
+def ics_event_lines(record, stamp):
+    """VEVENT content lines for one showing; timed when a showtime is known, all-day otherwise."""
+    day = date.fromisoformat(record['date'])
+    uid_source = f"{record.get('link')}|{record['date']}|{record.get('plan', '')}"
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{hashlib.sha1(uid_source.encode('utf-8')).hexdigest()}@biletinial-etkinlik-planlayici",
+        f"DTSTAMP:{stamp}",
+    ]
+    showtimes = record.get('showtimes') or ()
+    if showtimes:
+        hour, minute = showtimes[0].split(':')
+        lines.append(f"DTSTART:{day.strftime('%Y%m%d')}T{int(hour):02d}{minute}00")
+        lines.append(f"DURATION:{ICS_DEFAULT_DURATION}")
+    else:
+        lines.append(f"DTSTART;VALUE=DATE:{day.strftime('%Y%m%d')}")
+    lines.append(f"SUMMARY:{ics_escape(record.get('play', ''))}")
+    if record.get('venue'):
+        lines.append(f"LOCATION:{ics_escape(record['venue'])}")
+    if record.get('link'):
+        lines.append(f"URL:{record['link']}")
+    description = [part for part in (record.get('plan'), (record.get('category') or '').upper(),
+                                     ', '.join(showtimes) if len(showtimes) > 1 else None,
+                                     'Tükendi' if record.get('sold_out') else None) if part]
+    if description:
+        lines.append(f"DESCRIPTION:{ics_escape(' | '.join(description))}")
+    lines.append("END:VEVENT")
+    return lines
+
+
+def write_ics(output_file, records, fields=None):
+    """One VCALENDAR with a VEVENT per record; `fields` is accepted for a uniform signature."""
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    for line in ("BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{ICS_PRODID}", "CALSCALE:GREGORIAN"):
+        output_file.write(ics_fold(line))
+    count = 0
+    for record in records:
+        for line in ics_event_lines(record, stamp):
+            output_file.write(ics_fold(line))
+        count += 1
+    output_file.write(ics_fold("END:VCALENDAR"))
+    return count
+
+
+RECORD_WRITERS = {'jsonl': write_jsonl, 'csv': write_csv, 'ics': write_ics}
+
+
+def write_records(output_file, output_format, records, fields=SHOWING_FIELDS):
+    """Streams `records` to `output_file` in 'jsonl', 'csv' or 'ics'; returns the number written."""
+    return RECORD_WRITERS[output_format](output_file, records, fields)
+
+
+def open_output(filename, output_format):
+    # csv and ics manage their own line endings
+    return open(filename, 'w', encoding='utf-8', newline='' if output_format in ('csv', 'ics') else None)
@@ -1,53 +1,80 @@
 import re
+import os
+import sys
+import json
 import argparse
-from datetime import datetime, timedelta
+import heapq
+import itertools
+import io
+import time
+import warnings
+from bisect import bisect_left, insort
+from collections import namedtuple, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import biletinial_dates
+import biletinial_events
+import biletinial_identity
+import biletinial_metrics
+import biletinial_store
+import biletinial_writers
 
 # python etkinlik_planlayici.py --start-date "Nisan 18" ; "(Roo/PS Workaround: 34)" > $null; start-sleep -milliseconds 150
 
-# Türkçe ay isimleri ve tarih işlemleri için locale ayarı kaldırıldı.
-# Doğrudan ay çeviri sözlüğü kullanılacak.
+# Tarihler biletinial_dates ile bir kez ayrıştırılır; etkinliklerde 'date' (datetime) yanında
+# 'day' (gün ordinal'i, int) tutulur, sıralama/filtreleme/gün aralığı kontrolleri int üzerinden yapılır.
+# Oyun kimliği isim yerine biletinial_identity.play_key ile belirlenir: büyük/küçük harf, Türkçe
+# karakter ve "- ANTALYA DT" gibi topluluk ekleri farklı olsa da aynı oyun tek oyun sayılır.
 
-# Türkçe ay isimlerini İngilizce'ye çevirmek için sözlük
+# Eski API ile uyumluluk için tutulur; tarih ayrıştırma artık bunları kullanmaz (bkz. biletinial_dates)
 ay_ceviri = {
     "Ocak": "January", "Şubat": "February", "Mart": "March", "Nisan": "April",
     "Mayıs": "May", "Haziran": "June", "Temmuz": "July", "Ağustos": "August",
     "Eylül": "September", "Ekim": "October", "Kasım": "November", "Aralık": "December"
 }
-# İngilizce ay isimlerini Türkçe'ye çevirmek için ters sözlük
 ay_ceviri_ters = {v: k for k, v in ay_ceviri.items()}
+current_year = time.localtime().tm_year
+
+def warn_ignored_date_args(function_name, year, ay_ceviri_dict):
+    """Eski çağrılardaki year / ay_ceviri_dict argümanları kabul edilir ama yok sayılır."""
+    if year is not None or ay_ceviri_dict is not None:
+        warnings.warn(f"{function_name}(): year ve ay_ceviri_dict artık kullanılmıyor, yıl biletinial_dates ile "
+                      f"bugüne göre belirlenir (Aralık'tan sonraki Ocak bir sonraki yıla düşer)",
+                      DeprecationWarning, stacklevel=3)
+
+def parse_start_date(date_str, year=None, ay_ceviri_dict=None):
+    """
+    Verilen 'Ay Gün' formatındaki stringi gün başı datetime nesnesine çevirir (geçmiş aylar gelecek yıla düşer).
+    year ve ay_ceviri_dict eski imzayla uyumluluk içindir, verilirse DeprecationWarning ile yok sayılır.
+    """
+    warn_ignored_date_args('parse_start_date', year, ay_ceviri_dict)
+    ordinal = biletinial_dates.parse_month_day(date_str)
+    if ordinal is None:
+        print(f"Başlangıç tarihi ayrıştırma hatası: '{date_str}' 'Ay Gün' formatında olmalı (örn: Mayıs 11)")
+        return None
+    return biletinial_dates.to_datetime(ordinal)
 
-# Yılı dinamik olarak alalım
-current_year = datetime.now().year
+SHOWTIME_RE = re.compile(r"\d{1,2}:\d{2}")
 
-def parse_start_date(date_str, year, ay_ceviri_dict):
-    """Verilen 'Ay Gün' formatındaki stringi datetime nesnesine çevirir."""
-    try:
-        parts = date_str.split()
-        if len(parts) != 2:
-            raise ValueError("Tarih formatı 'Ay Gün' olmalı (örn: Mayıs 11)")
-        month_tr, day_str = parts
-        month_en = ay_ceviri_dict.get(month_tr.capitalize())
-        if not month_en:
-            raise ValueError(f"Geçersiz ay adı: {month_tr}")
-        day = int(day_str)
-        start_date_obj = datetime.strptime(f"{day} {month_en} {year}", "%d %B %Y")
-        # Saat/dakika/saniye bilgisini sıfırlayarak sadece gün bazında karşılaştırma yapalım
-        return start_date_obj.replace(hour=0, minute=0, second=0, microsecond=0)
-    except ValueError as e:
-        print(f"Başlangıç tarihi ayrıştırma hatası: {e}")
-        return None
-    except Exception as e:
-        print(f"Beklenmedik başlangıç tarihi hatası: {e}")
-        return None
+# Etkinlikler sıkıştırılmış tabloda tutulur: metin alanları tek havuzda, gün int sütunda;
+# 'date' okunurken gün ordinal'inden üretilir
+EVENT_FIELDS = ('name', 'full_detail', 'venue', 'category', 'link', 'showtimes', 'sold_out')
+
+def new_event_table():
+    return biletinial_events.EventTable(EVENT_FIELDS, int_fields=('day',),
+                                        derived={'date': ('day', biletinial_dates.to_datetime)})
 
-def parse_events(text, year, ay_ceviri_dict):
-    """Metinden etkinlikleri ayrıştırır ve tarih bilgisi ekler."""
-    events = []
-    current_month_str = None
-    current_day = None
+def parse_events(text, year=None, ay_ceviri_dict=None):
+    """
+    Metinden etkinlikleri ayrıştırır ve tarih bilgisi ekler.
+    year ve ay_ceviri_dict eski imzayla uyumluluk içindir, verilirse DeprecationWarning ile yok sayılır.
+    """
+    warn_ignored_date_args('parse_events', year, ay_ceviri_dict)
+    table = new_event_table()
+    current_day = None  # geçerli tarih satırının gün ordinal'i
 
     # Etkinlik satırını yakalamak için regex
-    event_pattern = re.compile(r"^\s*-\s*(\[.*?\])\s*(.*?)\s*->\s*(https?://.*)")
+    # URL'den sonra isteğe bağlı detay alanları gelebilir: " | 20:30 | 150-300 TL | Tükendi"
+    event_pattern = re.compile(r"^\s*-\s*(\[.*?\])\s*(.*?)\s*->\s*(https?://\S+)(.*)")
 
     for line in text.strip().split('\n'):
         line = line.strip()
@@ -57,99 +84,661 @@ def parse_events(text, year, ay_ceviri_dict):
         # Tarih satırı kontrolü (örn: Nisan - 10:)
         date_match = re.match(r"(\w+)\s*-\s*(\d+):", line)
         if date_match:
-            current_month_str = date_match.group(1).capitalize()
-            current_day = int(date_match.group(2))
+            # Tarih satırı bir kez ayrıştırılır, altındaki tüm etkinlikler aynı günü paylaşır
+            date_key = f"{date_match.group(1).capitalize()} - {date_match.group(2).zfill(2)}"
+            current_day = biletinial_dates.parse_date_key(date_key)
+            if current_day is None:
+                print(f"Tarih dönüştürme hatası: {date_key}")
             continue
 
         # Etkinlik satırı kontrolü
         event_match = event_pattern.match(line)
-        if event_match and current_month_str and current_day:
+        if event_match and current_day:
             event_type = event_match.group(1)
             details = event_match.group(2).strip()
             url = event_match.group(3).strip()
+            extras = [extra.strip() for extra in event_match.group(4).split('|') if extra.strip()]
 
             # Etkinlik ismini ayıklama (Genellikle '–' öncesi kısım)
             event_name = details.split('–')[0].strip()
 
-            # Tarih oluşturma (locale bağımsız)
-            month_en = ay_ceviri_dict.get(current_month_str)
-            if not month_en:
-                print(f"Bilinmeyen ay: {current_month_str}")
-                continue
-
-            try:
-                date_str_en = f"{current_day} {month_en} {year}"
-                # İngilizce ay ismine göre parse et (%B formatı İngilizce ay isimlerini bekler)
-                event_date = datetime.strptime(date_str_en, "%d %B %Y")
-                # Tarih karşılaştırması için saat/dakika/saniye sıfırlama
-                event_date = event_date.replace(hour=0, minute=0, second=0, microsecond=0)
-            except ValueError:
-                print(f"Tarih dönüştürme hatası: {date_str_en}")
-                continue
-            except Exception as e:
-                 print(f"Beklenmedik tarih hatası: {e}, Tarih: {date_str_en}")
-                 continue
-
-            events.append({
-                'date': event_date,
+            table.append({
+                'day': current_day,
                 'name': event_name,
-                'full_detail': line.lstrip('- ') # Orijinal formatı koru
+                'full_detail': line.lstrip('- '), # Orijinal formatı koru
+                'venue': details.split('–', 1)[1].strip() if '–' in details else '',
+                'category': event_type.strip('[]').lower(),
+                'link': url,
+                'showtimes': tuple(showtime.strip() for extra in extras if SHOWTIME_RE.fullmatch(extra.split(',')[0].strip())
+                                   for showtime in extra.split(',')),
+                'sold_out': 'Tükendi' in extras
             })
 
     # Etkinlikleri tarihe göre sırala
-    events.sort(key=lambda x: x['date'])
+    events = table.rows()
+    events.sort(key=lambda x: x['day'])
     return events
 
+def load_events_from_store(db_path, start_date=None):
+    """SQLite etkinlik deposundan başlangıç tarihinden itibaren etkinlikleri parse_events formatında okur."""
+    conn = biletinial_store.connect(db_path)
+    try:
+        rows = biletinial_store.query_showings(conn, start_date=start_date)
+    finally:
+        conn.close()
+    return events_from_rows(rows)
+
+def events_from_rows(rows):
+    """
+    biletinial_store.query_showings formatındaki satırları
+    (date, play, venue, category, link, showtimes, price_min, price_max, sold_out) parse_events formatına çevirir.
+    """
+    table = new_event_table()
+    for day, play, venue, category, link, showtimes, price_min, price_max, sold_out in rows:
+        extras = []
+        if showtimes:
+            extras.append(', '.join(showtimes))
+        if price_min is not None:
+            extras.append(f"{price_min:g} TL" if price_min == price_max else f"{price_min:g}-{price_max:g} TL")
+        if sold_out:
+            extras.append("Tükendi")
+        table.append({
+            'day': day.toordinal(),
+            'name': play,
+            'full_detail': f"[{category.upper()}] {play} – {venue} -> {link}" + ''.join(f" | {extra}" for extra in extras),
+            'venue': venue,
+            'category': category,
+            'link': link,
+            'showtimes': tuple(showtimes),
+            'sold_out': bool(sold_out)
+        })
+    return table.rows()
+
+def drop_sold_out(events):
+    """Biletleri tükenmiş gösterimleri plandan çıkarır."""
+    return [event for event in events if not event.get('sold_out')]
+
+def drop_watched(events, watched):
+    """İzlenmiş oyunların (biletinial_identity.PlayMatcher) gösterimlerini plandan çıkarır."""
+    return [event for event in events if not watched.matches(event['name'], event.get('link'))]
+
 def create_plan(events, min_days_apart=3):
-    """Verilen etkinlik listesinden, aynı isimli oyunları tekrarlamadan ve belirli gün aralığıyla plan oluşturur."""
+    """Verilen etkinlik listesinden, aynı oyunu tekrarlamadan ve belirli gün aralığıyla plan oluşturur."""
     planned_events = []
-    planned_names = set()
-    last_event_date = None
+    planned_plays = set()
+    last_event_day = None
 
     for event in events:
-        event_name = event['name']
-        event_date = event['date']
-
-        # Eğer bu oyun daha önce plana eklenmediyse
-        if event_name not in planned_names:
-            # Eğer ilk etkinlikse veya son etkinlikten yeterince gün geçtiyse
-            if last_event_date is None or (event_date - last_event_date).days >= min_days_apart:
+        event_day = event['day']
+
+        # Eğer ilk etkinlikse veya son etkinlikten yeterince gün geçtiyse (ucuz kontrol önce,
+        # oyun kimliği yalnızca bu koşulu geçen gösterimler için hesaplanır)
+        if last_event_day is None or event_day - last_event_day >= min_days_apart:
+            play = biletinial_identity.play_key(event['name'])
+            # Eğer bu oyun daha önce plana eklenmediyse
+            if play not in planned_plays:
                 planned_events.append(event)
-                planned_names.add(event_name)
-                last_event_date = event_date
+                planned_plays.add(play)
+                last_event_day = event_day
 
     return planned_events
 
-def format_plan(planned_events):
-    """Oluşturulan planı okunabilir formatta string'e çevirir."""
+# Tam çözücü ayarları
+DEFAULT_TIME_BUDGET = 5.0     # saniye; dolarsa o ana kadarki en iyi plan döner
+MAX_MEMO_STATES = 2_000_000   # ziyaret edilen (indeks, kullanılan oyunlar) durumu sınırı
+
+# plan() sonucu: toplam skor (oyun sayısı ya da ağırlık toplamı) ve tarih sıralı etkinlikler
+Plan = namedtuple('Plan', ['score', 'events'])
+
+class PlanSearchSpace:
+    """
+    Plan aramalarının ortak ön hesaplamaları: tarih sıralı adaylar (aynı gün aynı mekanda aynı oyun tek gösterim),
+    oyun bit maskeleri, bir gösterim seçilince sıradaki en erken aday ve skor üst sınırı.
+
+    Üst sınır iki kapasitenin küçüğüdür: gün aralığı koşuluyla art arda seçilebilecek en fazla gösterim
+    ve oyunların gün bloklarına eşleştirilmesi. Günler min_days_apart uzunluğunda bloklara bölünür; bir
+    blokta en fazla bir gösterim seçilebilir, her oyun da yalnızca gösterimi olan bir bloğa düşebilir.
+    Her oyunun blokları ilk ve son gösterimi arasındaki aralığa genişletilirse en büyük eşleşme
+    "en erken biten önce" sırasıyla tam bulunur ve gerçek eşleşmeden küçük olamaz; oyunların sahne
+    kapasitesinden fazla olduğu (çoğu oyunun birbirini dışladığı) girdilerde sınır bu sayede kapanır.
+    """
+
+    def __init__(self, events, min_days_apart=3, weights=None):
+        # Ağırlıklar oyun ismiyle verilir, oyun kimliğine (play_key) çevrilir
+        self.weights = {biletinial_identity.play_key(name): weight for name, weight in (weights or {}).items()}
+
+        # Aynı gün aynı mekanda aynı oyunun tek gösterimi yeterli; farklı mekanlar ayrı aday kalır
+        # (zorunlu ya da engelli mekanlar yalnızca birinde oynanan gösterime ulaşabilmeli)
+        self.candidates = []
+        self.plays = []  # adayların oyun kimlikleri
+        play_of = {}     # isim -> oyun kimliği, her isim için bir kez hesaplanır
+        seen = set()
+        for event in sorted(events, key=lambda x: x['day']):
+            name = event['name']
+            play = play_of.get(name)
+            if play is None:
+                play = play_of[name] = biletinial_identity.play_key(name)
+            key = (event['day'], play, event.get('venue'))
+            if key not in seen:
+                seen.add(key)
+                self.candidates.append(event)
+                self.plays.append(play)
+
+        # Oyunlar ağırlığa göre azalan sırada bit alır; üst sınırda en ağır oyunlar en düşük bitlerden okunur
+        names = sorted(set(self.plays), key=lambda name: -self.weights.get(name, 1))
+        self.bit_of = {name: 1 << position for position, name in enumerate(names)}
+        self.weight_by_position = [self.weights.get(name, 1) for name in names]
+        self.uniform = all(weight == 1 for weight in self.weight_by_position)
+
+        n = self.n = len(self.candidates)
+        self.days = [event['day'] for event in self.candidates]
+        self.bits = [self.bit_of[play] for play in self.plays]
+        self.event_weights = [self.weights.get(play, 1) for play in self.plays]
+        # i seçilirse sıradaki adayın en erken indeksi
+        self.next_index = [max(i + 1, bisect_left(self.days, self.days[i] + min_days_apart)) for i in range(n)]
+        # i'den sonra gösterimi olan oyunlar
+        self.suffix_mask = [0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            self.suffix_mask[i] = self.suffix_mask[i + 1] | self.bits[i]
+        # i'den itibaren gün aralığı koşuluyla art arda seçilebilecek en fazla gösterim (oyun tekrarı göz ardı edilerek)
+        self.chain_length = [0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            self.chain_length[i] = max(self.chain_length[i + 1], 1 + self.chain_length[self.next_index[i]])
+
+        # Gün blokları (yalnızca gösterimi olan bloklar, sırayla numaralanır) ve her oyunun gösterim indeksleri
+        self.block_matching = min_days_apart >= 1
+        block_ids = [day // max(min_days_apart, 1) for day in self.days]
+        block_rank = {block: rank for rank, block in enumerate(sorted(set(block_ids)))}
+        self.block = [block_rank[block] for block in block_ids]
+        self.play_indices = [[] for _ in names]
+        for i, bit in enumerate(self.bits):
+            self.play_indices[bit.bit_length() - 1].append(i)
+        self.block_intervals = {}  # i -> başlangıç sıralı (ilk blok, son blok, oyun biti), ilk istendiğinde hesaplanır
+        self.bound_memo = {}
+
+    def block_capacity(self, i, available):
+        """i'den itibaren kullanılmamış oyunların gün bloklarına en büyük eşleşmesi (oyun aralıkları genişletilmiş)."""
+        # Her oyun için (i'den sonraki ilk gösteriminin bloğu, son gösteriminin bloğu)
+        all_intervals = self.block_intervals.get(i)
+        if all_intervals is None:
+            all_intervals = []
+            remaining = self.suffix_mask[i]
+            while remaining:
+                lowest = remaining & -remaining
+                indices = self.play_indices[lowest.bit_length() - 1]
+                all_intervals.append((self.block[indices[bisect_left(indices, i)]], self.block[indices[-1]], lowest))
+                remaining ^= lowest
+            all_intervals.sort()
+            self.block_intervals[i] = all_intervals
+        intervals = [interval for interval in all_intervals if available & interval[2]]
+        # Bloklar sırayla doldurulur, her blok açık aralıklardan en erken biteni alır
+        matched, position, block, ends = 0, 0, 0, []
+        count = len(intervals)
+        while position < count or ends:
+            if not ends:
+                block = max(block, intervals[position][0])
+            while position < count and intervals[position][0] <= block:
+                heapq.heappush(ends, intervals[position][1])
+                position += 1
+            while ends and ends[0] < block:
+                heapq.heappop(ends)
+            if ends:
+                heapq.heappop(ends)
+                matched += 1
+                block += 1
+        return matched
+
+    def heaviest(self, available, capacity):
+        """available oyunlarından en ağır capacity tanesinin ağırlık toplamı."""
+        if self.uniform:
+            return min(capacity, available.bit_count())
+        total = 0
+        while available and capacity:
+            lowest = available & -available
+            total += self.weight_by_position[lowest.bit_length() - 1]
+            available ^= lowest
+            capacity -= 1
+        return total
+
+    def upper_bound(self, i, used, target=None):
+        """
+        i'den itibaren eklenebilecek en yüksek skor: sığabilecek gösterim sayısı × en ağır kullanılmamış oyunlar.
+        target verilirse ve ucuz sınır (blok eşleşmesi olmadan) onu aşmıyorsa ucuz sınır döner: dal zaten budanır.
+        """
+        if i >= self.n:
+            return 0
+        available = self.suffix_mask[i] & ~used
+        if self.uniform and target is not None:
+            bound = min(self.chain_length[i], available.bit_count())
+            if bound <= target:
+                return bound
+        key = (i, available)
+        bound = self.bound_memo.get(key)
+        if bound is None:
+            bound = self.heaviest(available, self.chain_length[i])
+            if target is not None and bound <= target:
+                return bound
+            if self.block_matching:
+                bound = min(bound, self.heaviest(available, self.block_capacity(i, available)))
+            if len(self.bound_memo) < MAX_MEMO_STATES:
+                self.bound_memo[key] = bound
+        return bound
+
+    def indices_of(self, chosen):
+        """(indeks, önceki) bağlı listesini artan aday indeksleri listesine çevirir."""
+        indices = []
+        while chosen:
+            indices.append(chosen[0])
+            chosen = chosen[1]
+        indices.reverse()
+        return indices
+
+    def events_of(self, chosen):
+        """(indeks, önceki) bağlı listesini tarih sıralı etkinlik listesine çevirir."""
+        return [self.candidates[i] for i in self.indices_of(chosen)]
+
+def create_optimal_plan(events, min_days_apart=3, weights=None, time_budget=DEFAULT_TIME_BUDGET):
+    """
+    Aynı oyunu tekrarlamadan ve min_days_apart koşuluyla en çok oyunu (weights verilirse en yüksek
+    toplam ağırlığı) içeren planı dal-sınır (branch-and-bound) aramasıyla bulur.
+    Arama greedy planla başlar; süre bütçesi dolarsa o ana kadarki en iyi plan döner.
+    Dönüş: (planlanan etkinlikler, planın optimal olduğu kanıtlandı mı)
+    """
+    space = PlanSearchSpace(events, min_days_apart, weights)
+    if not space.candidates:
+        return [], True
+    n, days, bits, next_index, event_weights = space.n, space.days, space.bits, space.next_index, space.event_weights
+
+    # Başlangıç çözümü: greedy plan ile "son gösterimi en yakın oyunu önce seç" sezgiselinden iyi olanı
+    greedy_plan = create_plan(space.candidates, min_days_apart)
+    best_score = sum(space.weights.get(biletinial_identity.play_key(event['name']), 1) for event in greedy_plan)
+    best_chosen = None # None: greedy plan daha iyisi bulunana kadar geçerli
+
+    last_showing = {}
+    for i, play in enumerate(space.plays):
+        last_showing[play] = i
+    urgent_chosen, urgent_score, used, i = None, 0, 0, 0
+    while i < n:
+        # i gününün gösterimlerinden kullanılmamış ve son gösterimi en yakın olanı seç
+        day_end = bisect_left(days, days[i] + 1)
+        options = [j for j in range(i, day_end) if not used & bits[j]]
+        if not options:
+            i = day_end
+            continue
+        j = min(options, key=lambda k: last_showing[space.plays[k]])
+        urgent_chosen, urgent_score, used = (j, urgent_chosen), urgent_score + event_weights[j], used | bits[j]
+        i = next_index[j]
+    if urgent_score > best_score:
+        best_score, best_chosen = urgent_score, urgent_chosen
+
+    deadline = time.monotonic() + time_budget
+    visited = set()
+    optimal = True
+    nodes = 0
+    # (indeks, kullanılan oyun maskesi, skor, seçilenler bağlı listesi (indeks, önceki))
+    stack = [(0, 0, 0, None)]
+    while stack:
+        nodes += 1
+        if nodes % 1024 == 0 and time.monotonic() > deadline:
+            optimal = False
+            break
+        i, used, score, chosen = stack.pop()
+        if score > best_score:
+            best_score, best_chosen = score, chosen
+        if i >= n or score + space.upper_bound(i, used, best_score - score) <= best_score:
+            continue
+        # Aynı oyun kümesiyle aynı indekse gelindiyse skor da aynıdır, tekrar aramaya gerek yok
+        state = (i, used)
+        if state in visited:
+            continue
+        if len(visited) < MAX_MEMO_STATES:
+            visited.add(state)
+
+        # LIFO: önce i'yi dahil eden dal denenir
+        stack.append((i + 1, used, score, chosen))
+        if not used & bits[i]:
+            stack.append((next_index[i], used | bits[i], score + event_weights[i], (i, chosen)))
+
+    if best_chosen is None:
+        return greedy_plan, optimal
+    return space.events_of(best_chosen), optimal
+
+def plan(events, constraints=None):
+    """
+    En iyi planları skor sırasıyla tembel (lazy) üretir; ilk K plan için itertools.islice(plan(...), K).
+    En iyi-önce (best-first) arama: her düğümün önceliği skor + üst sınırdır, bu yüzden tamamlanan
+    ilk plan en iyisi, sonraki her plan bir sonraki en iyisidir. Yalnızca maksimal planlar üretilir
+    (kısıtları bozmadan eklenebilecek gösterim kalmamış), boş plan hiç üretilmez.
+    Dönen PlanSearch'ün truncated alanı süre bütçesinin listeyi kısalttığını gösterir.
+
+    constraints sözlüğü (hepsi opsiyonel):
+      min_days_apart   etkinlikler arası en az gün (default 3)
+      weights          {oyun: skor} tercih ağırlıkları (default her oyun 1)
+      weekdays         izin verilen haftanın günleri, 0 = Pazartesi
+      max_per_week     bir takvim haftasında en fazla etkinlik
+      required_plays   planda mutlaka olacak oyunlar (isimler play_key ile eşleştirilir)
+      blocked_plays    plana alınmayacak oyunlar (isim ya da biletinial linki, PlayMatcher ile eşleştirilir)
+      required_venues  planda en az bir kez yer alacak mekanlar
+      blocked_venues   plana alınmayacak mekanlar
+      category_quotas  {kategori: en fazla etkinlik}, örn. {'opera-bale': 1}
+      time_budget      saniye; dolarsa üretim durur
+    """
+    return PlanSearch(events, constraints)
+
+class PlanSearch:
+    """
+    plan() sonucu: en iyi planları skor sırasıyla üreten iterator (next(plan(...)) en iyi planı verir,
+    tek kez tüketilir). Arama önce bütçenin yarısıyla bir
+    yedek plan bulur (ek kısıt yoksa create_optimal_plan, varsa ilk tam plan); bütçe ilk plan
+    bulunmadan dolarsa bu yedek plan üretilir, böylece uygun bir plan varsa en az biri döner.
+    Bütçe aramayı kestiyse truncated True olur: liste istenenden kısa ya da ilk plan kanıtlanmamış olabilir.
+    """
+
+    def __init__(self, events, constraints=None):
+        self.events = events
+        self.constraints = constraints or {}
+        self.truncated = False
+        self.plans = None  # ilk next() çağrısında başlayan search() generator'ı
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.plans is None:
+            self.plans = self.search()
+        return next(self.plans)
+
+    def search(self):
+        constraints = self.constraints
+        self.truncated = False
+        weekdays = constraints.get('weekdays')
+        blocked_plays = biletinial_identity.PlayMatcher(constraints.get('blocked_plays') or ())
+        blocked_venues = set(constraints.get('blocked_venues') or ())
+        required_plays = {biletinial_identity.play_key(name) for name in constraints.get('required_plays') or ()}
+        required_venues = sorted(set(constraints.get('required_venues') or ()))
+        max_per_week = constraints.get('max_per_week')
+        quotas = constraints.get('category_quotas') or {}
+        min_days_apart = constraints.get('min_days_apart', 3)
+        time_budget = constraints.get('time_budget', DEFAULT_TIME_BUDGET)
+        started = time.monotonic()
+        deadline = started + time_budget
+
+        allowed = [event for event in self.events
+                   if (weekdays is None or biletinial_dates.weekday(event['day']) in weekdays)
+                   and not (blocked_plays and blocked_plays.matches(event['name'], event.get('link')))
+                   and event.get('venue') not in blocked_venues]
+        space = PlanSearchSpace(allowed, min_days_apart, constraints.get('weights'))
+        n, days, bits, next_index, event_weights = space.n, space.days, space.bits, space.next_index, space.event_weights
+
+        # Zorunlu oyun ya da mekanın hiç gösterimi kalmadıysa uygun plan yok
+        venue_bit = {venue: 1 << position for position, venue in enumerate(required_venues)}
+        if required_plays - space.bit_of.keys() or set(required_venues) - {event.get('venue') for event in space.candidates}:
+            return
+        required_mask = sum(space.bit_of[name] for name in required_plays)
+        all_venues_mask = (1 << len(required_venues)) - 1
+        venue_bits = [venue_bit.get(event.get('venue'), 0) for event in space.candidates]
+        suffix_venue_mask = [0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            suffix_venue_mask[i] = suffix_venue_mask[i + 1] | venue_bits[i]
+
+        weeks = [biletinial_dates.week_number(event['day']) for event in space.candidates]
+        quota_categories = sorted(quotas)
+        quota_slot = [quota_categories.index(event.get('category')) if event.get('category') in quotas else -1
+                      for event in space.candidates]
+        quota_limits = [quotas[category] for category in quota_categories]
+
+        def includable(i, used, week, week_count, category_counts):
+            if used & bits[i]:
+                return False
+            if max_per_week is not None and weeks[i] == week and week_count >= max_per_week:
+                return False
+            slot = quota_slot[i]
+            return slot < 0 or category_counts[slot] < quota_limits[slot]
+
+        def next_includable(i, used, week, week_count, category_counts):
+            while i < n and not includable(i, used, week, week_count, category_counts):
+                i += 1
+            return i
+
+        def feasible(node):
+            # Kalan gösterimlerle zorunlu oyun/mekan tamamlanamıyorsa dal geçersiz
+            i, used, venues = node[0], node[1], node[2]
+            return not (required_mask & ~used & ~space.suffix_mask[min(i, n)]
+                        or all_venues_mask & ~venues & ~suffix_venue_mask[min(i, n)])
+
+        def children(node):
+            """Önce i'yi dahil eden, sonra i'yi atlayan düğüm (geçersiz olanlar hariç)."""
+            i, used, venues, week, week_count, category_counts, score, chosen = node
+            new_week_count = week_count + 1 if weeks[i] == week else 1
+            new_counts = category_counts
+            if quota_slot[i] >= 0:
+                new_counts = list(category_counts)
+                new_counts[quota_slot[i]] += 1
+                new_counts = tuple(new_counts)
+            new_used = used | bits[i]
+            include = (next_includable(next_index[i], new_used, weeks[i], new_week_count, new_counts),
+                       new_used, venues | venue_bits[i], weeks[i], new_week_count, new_counts,
+                       score + event_weights[i], (i, chosen))
+            skip = (next_includable(i + 1, used, week, week_count, category_counts),
+                    used, venues, week, week_count, category_counts, score, chosen)
+            return [child for child in (include, skip) if feasible(child)]
+
+        def insertable(indices):
+            """Tarih sıralı aday indekslerinden oluşan plana kısıtları bozmadan eklenebilecek ilk aday; yoksa None."""
+            used = 0
+            week_counts = defaultdict(int)
+            category_counts = [0] * len(quota_limits)
+            for i in indices:
+                used |= bits[i]
+                week_counts[weeks[i]] += 1
+                if quota_slot[i] >= 0:
+                    category_counts[quota_slot[i]] += 1
+            chosen_days = [days[i] for i in indices]
+            for j in range(n):
+                if used & bits[j] or (max_per_week is not None and week_counts[weeks[j]] >= max_per_week):
+                    continue
+                slot = quota_slot[j]
+                if slot >= 0 and category_counts[slot] >= quota_limits[slot]:
+                    continue
+                position = bisect_left(chosen_days, days[j])
+                if position and days[j] - chosen_days[position - 1] < min_days_apart:
+                    continue
+                if position < len(chosen_days) and chosen_days[position] - days[j] < min_days_apart:
+                    continue
+                return j
+            return None
+
+        def completed(indices):
+            """Eklenebilecek gösterim kalmayana kadar plana ekler."""
+            indices = list(indices)
+            j = insertable(indices)
+            while j is not None:
+                insort(indices, j)
+                j = insertable(indices)
+            return indices
+
+        def first_plan(deadline):
+            """Dahil-et-önce derinlik aramasıyla bulunan ilk tam plan (aday indeksleri); bulunamazsa None."""
+            stack = [root] if feasible(root) else []
+            nodes = 0
+            while stack:
+                nodes += 1
+                if nodes % 1024 == 0 and time.monotonic() > deadline:
+                    return None
+                node = stack.pop()
+                if node[0] >= n:
+                    return space.indices_of(node[-1])
+                stack.extend(reversed(children(node)))
+            return None
+
+        def as_plan(indices):
+            return Plan(sum(event_weights[i] for i in indices), [space.candidates[i] for i in indices])
+
+        no_counts = (0,) * len(quota_limits)
+        root = (next_includable(0, 0, None, 0, no_counts), 0, 0, None, 0, no_counts, 0, None)
+
+        # Yedek plan: ek kısıt yoksa create_optimal_plan (kanıtlandıysa doğrudan ilk plandır), varsa ilk tam plan
+        if max_per_week is None and not required_plays and not required_venues and not quotas:
+            seed_events, seed_proven = create_optimal_plan(space.candidates, min_days_apart, constraints.get('weights'),
+                                                           time_budget / 2)
+            position_of = {id(event): i for i, event in enumerate(space.candidates)}
+            seed = [position_of[id(event)] for event in seed_events]
+        else:
+            seed, seed_proven = first_plan(started + time_budget / 2), False
+        seed = completed(seed) if seed else None
+        yielded = 0
+        if seed and seed_proven:
+            yield as_plan(seed)
+            yielded += 1
+
+        def push(heap, node):
+            priority = node[6] + space.upper_bound(node[0], node[1])
+            # Eşit öncelikte en ilerideki ve en yeni düğüm önce: plato üzerinde derinlemesine ilerler
+            heapq.heappush(heap, (-priority, -node[0], -next(counter), node))
+
+        counter = itertools.count()
+        heap = []
+        if feasible(root):
+            push(heap, root)
+        while heap:
+            if time.monotonic() > deadline:
+                self.truncated = True
+                break
+            node = heapq.heappop(heap)[-1]
+            if node[0] >= n:
+                indices = space.indices_of(node[-1])
+                # Boş, genişletilebilir (baskın planın alt kümesi) ya da zaten üretilmiş yedek plan atlanır
+                if not indices or (seed_proven and indices == seed) or insertable(indices) is not None:
+                    continue
+                yield Plan(node[6], [space.candidates[i] for i in indices])
+                yielded += 1
+                continue
+            for child in children(node):
+                push(heap, child)
+
+        if self.truncated and not yielded and seed:
+            yield as_plan(seed)
+
+class EventIndex:
+    """
+    Bir kez yüklenip çok sayıda plan için paylaşılan etkinlik indeksi: tarih sıralı liste,
+    bisect ile aranan gün sayıları (ordinal) ve oyun başına gösterim listeleri.
+    """
+
+    def __init__(self, events):
+        self.events = sorted(events, key=lambda x: x['day'])
+        self.ordinals = [event['day'] for event in self.events]
+        self.showings_by_play = defaultdict(list)
+        for event in self.events:
+            self.showings_by_play[biletinial_identity.play_key(event['name'])].append(event)
+
+    def window(self, start_date=None, end_date=None):
+        """[start_date, end_date] aralığındaki etkinlikler (sınırlar opsiyonel), tarih sıralı."""
+        low = bisect_left(self.ordinals, start_date.toordinal()) if start_date else 0
+        high = bisect_left(self.ordinals, end_date.toordinal() + 1) if end_date else len(self.events)
+        return self.events[low:high]
+
+# Toplu modda her worker process'in indeksi (initializer ile bir kez kurulur)
+batch_index = None
+
+def init_batch_worker(index):
+    global batch_index
+    batch_index = index
+
+def plan_for_profile(profile, solver='optimal', time_budget=DEFAULT_TIME_BUDGET):
+    """
+    Tek kullanıcı profili için plan: {'user', 'start_date' ('Nisan 18'), 'min_days', 'watched' [oyunlar]}.
+    batch_index üzerinde çalışır; dönüş (kullanıcı, planlanan etkinlikler).
+    """
+    start_date = parse_start_date(profile['start_date']) if profile.get('start_date') else None
+    watched = biletinial_identity.PlayMatcher(profile.get('watched') or ())
+    min_days = profile.get('min_days', 4)
+    events = [event for event in batch_index.window(start_date)
+              if not (watched and watched.matches(event['name'], event.get('link')))]
+    if solver == 'optimal':
+        planned_events, _ = create_optimal_plan(events, min_days_apart=min_days, time_budget=time_budget)
+    else:
+        planned_events = create_plan(events, min_days_apart=min_days)
+    return profile.get('user', ''), planned_events
+
+def run_batch(index, profiles, solver='optimal', time_budget=DEFAULT_TIME_BUDGET, workers=None):
+    """
+    Profilleri paralel planlar; indeks her worker'a bir kez gönderilir.
+    Sonuçlar profil sırasıyla, hazır oldukça üretilir (generator).
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(profiles) <= 1:
+        init_batch_worker(index)
+        for profile in profiles:
+            yield plan_for_profile(profile, solver, time_budget)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_batch_worker, initargs=(index,)) as executor:
+        yield from executor.map(plan_for_profile, profiles, itertools.repeat(solver), itertools.repeat(time_budget),
+                                chunksize=max(1, len(profiles) // (workers * 4)))
+
+def load_profiles(profiles_filename):
+    """Her satırı bir JSON profil olan (JSON Lines) dosyayı okur."""
+    with open(profiles_filename, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def write_plan(output_file, planned_events, title="Önerilen Plan"):
+    """Oluşturulan planı okunabilir metin formatında dosyaya satır satır yazar."""
     if not planned_events:
-        return "--- Önerilen Plan ---\n(Belirtilen kriterlere uygun etkinlik bulunamadı)\n------------------------------"
-
-    output = ["--- Önerilen Plan ---"]
-    grouped_by_date = {}
-
-    for event in planned_events:
-        # Gruplama ve sıralama için İngilizce ay ismiyle tarih anahtarı oluştur
-        date_str = event['date'].strftime("%B - %d")
-        if date_str not in grouped_by_date:
-            grouped_by_date[date_str] = []
-        grouped_by_date[date_str].append(event['full_detail'])
-
-    # Tarihe göre sıralı yazdırma
-    # Sözlüğü tarihe göre sıralamak için datetime nesnelerine geri dönelim
-    # Yıl bilgisi önemli değil, sadece ay ve gün sıralaması için kullanılıyor
-    sorted_dates = sorted(grouped_by_date.keys(), key=lambda d: datetime.strptime(f"{d.split(' - ')[1]} {d.split(' - ')[0]} 2000", f"%d %B %Y"))
-
-
-    for date_key in sorted_dates: # date_key örn: "April - 10"
-        month_en, day_str = date_key.split(' - ')
-        month_tr = ay_ceviri_ters.get(month_en, month_en) # İngilizce ayı Türkçe'ye çevir
-        output.append(f"\n{month_tr} - {day_str}:") # Türkçe ay ismiyle yazdır
-        for detail in grouped_by_date[date_key]:
-            output.append(f"  - {detail}")
-
-    output.append("\n------------------------------")
-    return "\n".join(output)
+        output_file.write(f"--- {title} ---\n(Belirtilen kriterlere uygun etkinlik bulunamadı)\n------------------------------")
+        return
+
+    output_file.write(f"--- {title} ---")
+    # Gün ordinal'ine göre sıralı grupla; int anahtarlar yıl geçişinde de doğru sıralanır
+    for day, events in itertools.groupby(sorted(planned_events, key=lambda x: x['day']), key=lambda x: x['day']):
+        output_file.write(f"\n\n{biletinial_dates.date_key(day)}:") # Türkçe ay ismiyle yazdır, örn: "Nisan - 10"
+        for event in events:
+            output_file.write(f"\n  - {event['full_detail']}")
+    output_file.write("\n\n------------------------------")
+
+def format_plan(planned_events, title="Önerilen Plan"):
+    """Oluşturulan planı okunabilir formatta string'e çevirir."""
+    output = io.StringIO()
+    write_plan(output, planned_events, title)
+    return output.getvalue()
+
+# JSON Lines / CSV / iCalendar çıktısında her planlanan gösterim bir kayıt
+PLAN_FIELDS = ('plan', 'date', 'play', 'venue', 'category', 'link', 'showtimes', 'sold_out')
+
+def plan_record(event, title):
+    return {
+        'plan': title,
+        'date': biletinial_dates.to_datetime(event['day']).date().isoformat(),
+        'play': event['name'],
+        'venue': event.get('venue'),
+        'category': event.get('category'),
+        'link': event.get('link'),
+        'showtimes': list(event.get('showtimes') or ()),
+        'sold_out': event.get('sold_out')
+    }
+
+def write_plans(output_file, output_format, plans):
+    """
+    (başlık, planlanan etkinlikler) çiftlerini üretildikçe seçilen formatta yazar; metin formatında
+    planlar arasında boş satır bırakılır. Yazılan plan sayısını döner.
+    """
+    written = 0
+    if output_format == 'text':
+        for title, planned_events in plans:
+            if written:
+                output_file.write("\n\n")
+            write_plan(output_file, planned_events, title)
+            written += 1
+        return written
+
+    def records():
+        nonlocal written
+        for title, planned_events in plans:
+            written += 1
+            for event in planned_events:
+                yield plan_record(event, title)
+
+    biletinial_writers.write_records(output_file, output_format, records(), PLAN_FIELDS)
+    return written
 
 # Ana işlem akışı
 if __name__ == "__main__":
@@ -157,13 +746,69 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Biletinial etkinliklerinden plan oluşturur.")
     parser.add_argument("--start-date", type=str, help="Planın başlayacağı tarih (örn: 'Mayıs 11'). Bu tarihten önceki etkinlikler dahil edilmez.")
     parser.add_argument("--input", type=str, default="biletinial_scraper_output.txt", help="Girdi dosyasının adı.")
-    parser.add_argument("--output", type=str, default="etkinlik_planlayici_output.txt", help="Çıktı dosyasının adı.")
+    parser.add_argument("--output", type=str, default=None, help="Çıktı dosyasının adı (default: etkinlik_planlayici_output.<txt|jsonl|csv|ics>).")
+    parser.add_argument("--format", choices=biletinial_writers.OUTPUT_FORMATS, default='text', help="Çıktı formatı: okunabilir metin ya da her planlanan gösterim için bir kayıt (JSON Lines, CSV, iCalendar).")
+    parser.add_argument("--db", type=str, default=None, help="SQLite etkinlik deposu (verilirse --input yerine kullanılır).")
     parser.add_argument("--min-days", type=int, default=4, help="Aynı isimli oyunlar arasındaki minimum gün sayısı.")
+    parser.add_argument("--solver", choices=['optimal', 'greedy'], default='optimal', help="Plan algoritması: en çok oyunu bulan tam arama ya da ilk uyanı seçen greedy.")
+    parser.add_argument("--alternatives", type=int, default=1, help="Skor sırasıyla yazılacak alternatif plan sayısı.")
+    parser.add_argument("--time-budget", type=float, default=DEFAULT_TIME_BUDGET, help="Tam aramanın en fazla süresi (saniye); dolarsa bulunan en iyi plan kullanılır.")
+    parser.add_argument("--include-sold-out", action="store_true", help="Biletleri tükenmiş gösterimleri de plana dahil et (default: hariç tutulur).")
+    parser.add_argument("--watched-file", type=str, default=None, help="İzlenmiş oyunlar dosyası (her satırda bir oyun ismi ya da biletinial linki); bu oyunlar plana alınmaz.")
+    parser.add_argument("--batch", type=str, default=None, help="Kullanıcı profilleri dosyası (JSON Lines: user, start_date, min_days, watched); her kullanıcı için ayrı plan yazılır.")
+    parser.add_argument("--workers", type=int, default=None, help="Toplu modda paralel process sayısı (default: işlemci sayısı).")
+    parser.add_argument("--metrics-file", type=str, default=None, help="Aşama süreleri ve sayaçların yazılacağı dosya: *.json, *.jsonl (her çalıştırmada bir satır eklenir) ya da Prometheus textfile (örn. *.prom).")
+    parser.add_argument("--profile", nargs='?', const="etkinlik_planlayici.prof", default=None, help="Çalışmayı cProfile ile ölç, en pahalı fonksiyonları yazdır ve istatistikleri kaydet (default: etkinlik_planlayici.prof).")
     args = parser.parse_args()
+    output_filename = args.output or biletinial_writers.output_filename("etkinlik_planlayici_output", args.format)
+    if args.profile:
+        biletinial_metrics.start_profiling(args.profile)
+    # 'load': etkinliklerin okunması/ayrıştırılması, 'plan': planların aranıp dosyaya yazılması
+    metrics = biletinial_metrics.Metrics()
+
+    if args.batch:
+        # Toplu mod: etkinlikler bir kez okunup indekslenir, her profil bu indeks üzerinden planlanır
+        with metrics.stage('load'):
+            if args.db:
+                all_events = load_events_from_store(args.db)
+            else:
+                try:
+                    with open(args.input, 'r', encoding='utf-8') as f:
+                        all_events = parse_events(f.read())
+                except OSError as e:
+                    print(f"Hata: Girdi dosyası '{args.input}' okunamadı: {e}")
+                    sys.exit(1)
+            if not args.include_sold_out:
+                all_events = drop_sold_out(all_events)
+            if args.watched_file:
+                all_events = drop_watched(all_events, biletinial_identity.load_watched(args.watched_file))
+            index = EventIndex(all_events)
+            try:
+                profiles = load_profiles(args.batch)
+            except OSError as e:
+                print(f"Hata: Profil dosyası '{args.batch}' okunamadı: {e}")
+                sys.exit(1)
+            except ValueError as e:
+                print(f"Hata: Profil dosyası '{args.batch}' geçerli JSON Lines değil: {e}")
+                sys.exit(1)
+        metrics.count('events', len(all_events))
+
+        # Planlar hazır oldukça dosyaya yazılır, tüm sonuçlar bellekte tutulmaz
+        started = time.perf_counter()
+        with metrics.stage('plan'), biletinial_writers.open_output(output_filename, args.format) as f:
+            results = run_batch(index, profiles, args.solver, args.time_budget, args.workers)
+            planned = write_plans(f, args.format, ((f"{user} için Önerilen Plan", planned_events) for user, planned_events in results))
+        elapsed = time.perf_counter() - started
+        metrics.count('plans', planned)
+        print(f"{planned} kullanıcı için plan '{output_filename}' dosyasına yazıldı: "
+              f"{elapsed:.2f} sn, {planned / elapsed if elapsed else 0:.1f} plan/sn.")
+        if args.metrics_file:
+            biletinial_metrics.write_metrics(args.metrics_file, metrics, 'etkinlik_planlayici')
+        sys.exit(0)
 
     start_date = None
     if args.start_date:
-        start_date = parse_start_date(args.start_date, current_year, ay_ceviri)
+        start_date = parse_start_date(args.start_date)
         if start_date:
             print(f"Plan başlangıç tarihi olarak ayarlandı: {start_date.strftime('%d %B %Y (%A)')}")
         else:
@@ -172,50 +817,91 @@ if __name__ == "__main__":
             # import sys
             # sys.exit(1)
 
-    # Girdi ve çıktı dosyaları
+    # Girdi dosyası
     input_filename = args.input
-    output_filename = args.output
-
-    # Girdi dosyasını oku
-    request_text = ""
-    try:
-        with open(input_filename, 'r', encoding='utf-8') as f:
-            request_text = f.read()
-        print(f"'{input_filename}' dosyasından etkinlikler okundu.")
-    except FileNotFoundError:
-        print(f"Hata: Girdi dosyası '{input_filename}' bulunamadı.")
-    except Exception as e:
-        print(f"Hata: Girdi dosyası okunurken bir sorun oluştu: {e}")
-
-    if request_text: # Sadece girdi varsa devam et
-        all_events = parse_events(request_text, current_year, ay_ceviri)
-
-        # Başlangıç tarihine göre filtrele
-        if start_date:
-            original_count = len(all_events)
-            filtered_events = [event for event in all_events if event['date'] >= start_date]
-            filtered_count = len(filtered_events)
-            print(f"{original_count - filtered_count} etkinlik başlangıç tarihinden ({start_date.strftime('%d %b')}) önce olduğu için filtrelendi.")
-        else:
-            filtered_events = all_events # Filtreleme yok
-            print("Başlangıç tarihi belirtilmediği için tüm etkinlikler dikkate alınıyor.")
 
+    load_started = time.perf_counter()
+    filtered_events = None
+    if args.db:
+        # Depo sorgusu başlangıç tarihini doğrudan uygular, metin ayrıştırmaya gerek yok
+        filtered_events = load_events_from_store(args.db, start_date)
+        print(f"'{args.db}' deposundan {len(filtered_events)} etkinlik okundu.")
+    else:
+        # Girdi dosyasını oku
+        request_text = ""
+        try:
+            with open(input_filename, 'r', encoding='utf-8') as f:
+                request_text = f.read()
+            print(f"'{input_filename}' dosyasından etkinlikler okundu.")
+        except FileNotFoundError:
+            print(f"Hata: Girdi dosyası '{input_filename}' bulunamadı.")
+        except Exception as e:
+            print(f"Hata: Girdi dosyası okunurken bir sorun oluştu: {e}")
+
+        if request_text:
+            all_events = parse_events(request_text)
+
+            # Başlangıç tarihine göre filtrele
+            if start_date:
+                original_count = len(all_events)
+                start_day = start_date.toordinal()
+                filtered_events = [event for event in all_events if event['day'] >= start_day]
+                filtered_count = len(filtered_events)
+                print(f"{original_count - filtered_count} etkinlik başlangıç tarihinden ({start_date.strftime('%d %b')}) önce olduğu için filtrelendi.")
+            else:
+                filtered_events = all_events # Filtreleme yok
+                print("Başlangıç tarihi belirtilmediği için tüm etkinlikler dikkate alınıyor.")
+
+    if filtered_events and not args.include_sold_out:
+        available_events = drop_sold_out(filtered_events)
+        if len(available_events) < len(filtered_events):
+            print(f"{len(filtered_events) - len(available_events)} tükenmiş gösterim plandan çıkarıldı.")
+        filtered_events = available_events
+
+    if filtered_events and args.watched_file:
+        unwatched_events = drop_watched(filtered_events, biletinial_identity.load_watched(args.watched_file))
+        if len(unwatched_events) < len(filtered_events):
+            print(f"{len(filtered_events) - len(unwatched_events)} izlenmiş oyun gösterimi plandan çıkarıldı.")
+        filtered_events = unwatched_events
+    metrics.add_time('load', time.perf_counter() - load_started)
+    metrics.count('events', len(filtered_events or []))
+
+    if filtered_events is not None: # Sadece girdi varsa devam et
+        plan_started = time.perf_counter()
+        search = None
         if not filtered_events:
              print("Belirtilen başlangıç tarihinden sonra veya genel olarak işlenecek etkinlik bulunamadı.")
-             formatted_output = format_plan([]) # Boş plan formatla
+             plans = [("Önerilen Plan", [])] # Boş plan formatla
+        elif args.alternatives > 1:
+            # Alternatifler plan() generator'ından bulundukça yazılır
+            constraints = {'min_days_apart': args.min_days, 'time_budget': args.time_budget}
+            search = plan(filtered_events, constraints)
+            plans = ((f"Alternatif Plan {number} ({alternative.score} oyun)", alternative.events)
+                     for number, alternative in enumerate(itertools.islice(search, args.alternatives), 1))
+        elif args.solver == 'optimal':
+            suggested_plan, optimal = create_optimal_plan(filtered_events, min_days_apart=args.min_days, time_budget=args.time_budget)
+            if not optimal:
+                print(f"Süre bütçesi ({args.time_budget} sn) doldu, bulunan en iyi plan kullanılıyor.")
+            plans = [("Önerilen Plan", suggested_plan)]
         else:
-            suggested_plan = create_plan(filtered_events, min_days_apart=args.min_days)
-            formatted_output = format_plan(suggested_plan)
+            plans = [("Önerilen Plan", create_plan(filtered_events, min_days_apart=args.min_days))]
 
-        # Çıktıyı dosyaya yaz
+        # Çıktıyı dosyaya yaz (alternatifler yazılırken arandığı için yazma da 'plan' süresine dahildir)
         try:
-            with open(output_filename, 'w', encoding='utf-8') as f:
-                f.write(formatted_output)
+            with biletinial_writers.open_output(output_filename, args.format) as f:
+                planned = write_plans(f, args.format, plans)
+                if not planned and args.format == 'text':
+                    write_plan(f, [])
+            if search is not None and search.truncated:
+                print(f"Süre bütçesi ({args.time_budget} sn) doldu, {planned} alternatif plan yazıldı (istenen {args.alternatives}).")
+            metrics.add_time('plan', time.perf_counter() - plan_started)
+            metrics.count('plans', planned)
             print(f"Plan başarıyla '{output_filename}' dosyasına yazıldı.")
-        except Exception as e:
+        except OSError as e:
             print(f"Hata: Çıktı dosyasına yazılırken bir sorun oluştu: {e}")
-            print("\n--- Plan (Dosyaya Yazılamadı) ---")
-            print(formatted_output)
-            print("---------------------------------")
     else:
-        print("Girdi metni boş veya okunamadı. Plan oluşturulamadı.")
\ No newline at end of file
+        print("Girdi metni boş veya okunamadı. Plan oluşturulamadı.")
+
+    if args.metrics_file:
+        biletinial_metrics.write_metrics(args.metrics_file, metrics, 'etkinlik_planlayici')
+        print(f"Ölçümler '{args.metrics_file}' dosyasına yazıldı: {metrics.summary()}")
\ No newline at end of file
@@ -0,0 +1,29 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import etkinlik_planlayici as planlayici
+
+START = datetime(2027, 4, 1)
+
+
+def event(name, venue, offset):
+    day = START + timedelta(days=offset)
+    return {'date': day, 'day': day.toordinal(), 'name': name, 'venue': venue, 'full_detail': f"{name} – {venue}"}
+
+
+def test_plan_is_an_iterator():
+    events = [event('Hamlet', 'Y', 0), event('Lear', 'Y', 5)]
+    best = next(planlayici.plan(events))
+    assert best.score == 2
+    assert [e['name'] for e in best.events] == ['Hamlet', 'Lear']
+
+
+def test_required_venue_reaches_same_day_showing_at_another_venue():
+    # Hamlet plays at Y and X on the same day; only the X showing satisfies required_venues
+    events = [event('Hamlet', 'Y', 0), event('Hamlet', 'X', 0), event('Lear', 'Y', 5)]
+    plans = list(planlayici.plan(events, {'required_venues': ['X']}))
+    assert [[(e['name'], e['venue']) for e in p.events] for p in plans] == [[('Hamlet', 'X'), ('Lear', 'Y')]]
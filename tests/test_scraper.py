@@ -0,0 +1,76 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import biletinial_identity
+import biletinial_scraper as scraper
+from standin_server import start_server
+
+# The stand-in server replays tests/fixtures: a Manavgat listing with venue and film type filters
+# and a second page, plus the pages the site answers for ?loc=101 and ?loc=102. Venue 102 is
+# labelled "Manavgat Açıkhava Tiyatrosu" in the filter but listed as "Açıkhava Sahnesi".
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+@pytest.fixture
+def standin(monkeypatch):
+    server = start_server(fixture_dir=FIXTURE_DIR)
+    port = server.server_address[1]
+    monkeypatch.setattr(scraper, 'BASE_URL_FORMAT', f'http://127.0.0.1:{port}/tr-tr/{{category}}/')
+    monkeypatch.setattr(scraper, 'BASE_DOMAIN', f'http://127.0.0.1:{port}')
+    client = scraper.HttpClient(concurrency=2, rate=0)
+    yield server, client
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+
+def showings(grouped):
+    return sorted((date_key, event['play'], event['venue']) for date_key, events in grouped.items() for event in events)
+
+
+def test_discover_filters_reads_venue_and_film_type_markup():
+    with open(os.path.join(FIXTURE_DIR, 'tiyatro_manavgat.html'), encoding='utf-8') as f:
+        filters = scraper.discover_filters(f.read())
+    assert filters['venues'] == {'101': 'Manavgat Kültür Merkezi', '102': 'Manavgat Açıkhava Tiyatrosu', '103': 'Başka Salon'}
+    assert filters['filmtypes'] == {'490': 'Dram', '684': 'Komedi'}
+
+
+def test_listing_pagination_is_followed(standin):
+    server, client = standin
+    pages, complete = scraper.fetch_listing_pages(scraper.build_url('tiyatro', 'manavgat'), client)
+    assert complete
+    assert [event['play'] for event in scraper.extract_events_from_pages(pages, 'tiyatro')] == \
+        ['Kral Lear', 'Hamlet', 'Martı', 'Vanya Dayı', 'Hamlet']
+
+
+def test_discover_falls_back_to_venue_id_for_unmatched_label(standin, capsys):
+    server, client = standin
+    discovered_sources = {}
+    discovered = scraper.fetch_and_group_events(['tiyatro'], 'manavgat', ['101', '102'], [], [], client=client,
+                                                parse_workers=0, discover=True, watched=biletinial_identity.PlayMatcher(),
+                                                listing_sources=discovered_sources)
+    output = capsys.readouterr().out
+    assert "'manavgat açıkhava tiyatrosu'" in output
+    assert "'manavgat kültür merkezi'" not in output
+    # City page (reused from discovery), its second page and venue 102 by ID; venue 101 matched by name
+    assert server.stats['listing'] == 3
+
+    by_id_sources = {}
+    by_id = scraper.fetch_and_group_events(['tiyatro'], 'manavgat', ['101', '102'], [], [], client=client,
+                                           parse_workers=0, watched=biletinial_identity.PlayMatcher(),
+                                           listing_sources=by_id_sources)
+    assert showings(discovered) == showings(by_id)
+    # Venues kept by name are attributed to their ID listing, as if requested by ID
+    assert discovered_sources == by_id_sources == {scraper.build_url('tiyatro', 'manavgat', venue_id=venue_id): True
+                                                   for venue_id in ('101', '102')}
+    assert sorted(event['source'] for events in discovered.values() for event in events) == \
+        sorted(event['source'] for events in by_id.values() for event in events)
+    assert {(play, venue) for _, play, venue in showings(discovered)} == {
+        ('Kral Lear', 'Manavgat Kültür Merkezi'), ('Vanya Dayı', 'Manavgat Kültür Merkezi'), ('Hamlet', 'Açıkhava Sahnesi')}
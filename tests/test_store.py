@@ -0,0 +1,40 @@
+import os
+import sys
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import biletinial_store
+
+ANTALYA = 'https://biletinial.com/tr-tr/tiyatro/antalya'
+IZMIR = 'https://biletinial.com/tr-tr/tiyatro/izmir'
+
+
+def showing(day, play, source, venue='Sahne'):
+    return date(2027, 4, day), {'play': play, 'venue': venue, 'category': 'tiyatro',
+                                'link': f'https://biletinial.com/tr-tr/tiyatro/{play.lower()}', 'source': source}
+
+
+def stored(conn):
+    return sorted(conn.execute("SELECT p.name, s.date FROM showings s JOIN plays p ON p.id = s.play_id"))
+
+
+def test_prune_leaves_listings_not_fetched_alone(tmp_path):
+    conn = biletinial_store.connect(str(tmp_path / 'events.db'))
+    biletinial_store.save_showings(conn, [showing(1, 'Hamlet', ANTALYA), showing(3, 'Lear', ANTALYA)], [ANTALYA])
+    biletinial_store.save_showings(conn, [showing(2, 'Martı', IZMIR)], [IZMIR])
+
+    # Antalya again without Lear: Lear is gone, the Izmir showing inside the same dates stays
+    written, deleted = biletinial_store.save_showings(conn, [showing(1, 'Hamlet', ANTALYA), showing(4, 'Vanya', ANTALYA)],
+                                                      [ANTALYA])
+    assert (written, deleted) == (2, 1)
+    assert stored(conn) == [('Hamlet', '2027-04-01'), ('Martı', '2027-04-02'), ('Vanya', '2027-04-04')]
+
+
+def test_same_showing_written_twice_counts_once(tmp_path):
+    conn = biletinial_store.connect(str(tmp_path / 'events.db'))
+    written, deleted = biletinial_store.save_showings(conn, [showing(1, 'Hamlet', ANTALYA),
+                                                             showing(1, 'Hamlet', ANTALYA, venue='Büyük Sahne')])
+    assert (written, deleted) == (1, 0)
+    assert len(stored(conn)) == 1